@@ -26,8 +26,43 @@ import os
 import logging as log
 import math
 import copy
+import imp
+import json
+import bisect
+import struct
+import hashlib
+import binascii
+import re
+import gzip
+import zlib
+import socket
+import tempfile
+import threading
+import SocketServer
+import resource
+from collections import OrderedDict
+from itertools import imap
+from operator import itemgetter
 from lxml import etree
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import lzma
+except ImportError:
+    try:
+        from backports import lzma
+    except ImportError:
+        lzma = None
+
 from argparse import ArgumentParser
 from argparse import RawDescriptionHelpFormatter
 
@@ -92,6 +127,156 @@ typedef enum{
 } SPIRIT_BOOL_TYPE;
 '''
 
+C_META_STRTAB = "ipxact_strtab"
+
+C_META_NONE = 0xFFFFFFFF
+
+C_META_TYPES = '''
+#define IPXACT_META_NONE 0xFFFFFFFFu
+
+typedef struct{
+    unsigned int name;
+    unsigned int description;
+    unsigned int usage;
+} IPXACT_META_T;
+
+extern const char ipxact_strtab[];
+extern const IPXACT_META_T ipxact_ab_meta[];
+extern const IPXACT_META_T ipxact_reg_meta[];
+extern const IPXACT_META_T ipxact_field_meta[];
+'''
+
+# 32 bit FNV-1 offset basis and prime
+C_LOOKUP_OFFSET_BASIS = 0x811C9DC5
+C_LOOKUP_PRIME = 0x01000193
+
+C_LOOKUP_KINDS = ["IPXACT_LOOKUP_REGISTER", "IPXACT_LOOKUP_FIELD", "IPXACT_LOOKUP_ENUM"]
+
+C_LOOKUP_TYPES = '''
+#include <stddef.h>
+#include <stdint.h>
+
+#define IPXACT_LOOKUP_NONE 0xFFFFFFFFu
+
+typedef enum{
+    IPXACT_LOOKUP_REGISTER,
+    IPXACT_LOOKUP_FIELD,
+    IPXACT_LOOKUP_ENUM
+} IPXACT_LOOKUP_KIND_T;
+
+/* value is the address of a register, the bit offset of a field and the
+   value of an enum, width the size of a register and the bit width of a field */
+typedef struct{
+    const char *name;
+    IPXACT_LOOKUP_KIND_T kind;
+    uint32_t parent;
+    uint32_t width;
+    uint64_t value;
+} IPXACT_LOOKUP_T;
+
+extern const IPXACT_LOOKUP_T ipxact_lookup[];
+extern const uint32_t ipxact_lookup_count;
+
+uint32_t ipxact_lookup_id(const char *name);
+uint32_t ipxact_lookup_id_n(const char *name, size_t length);
+const char *ipxact_lookup_enum_name(uint32_t field, uint64_t value);
+int ipxact_lookup_selftest(void);
+'''
+
+C_LOOKUP_FUNCTIONS = '''
+static uint32_t ipxact_lookup_hash(uint32_t seed, const char *name, size_t length)
+{
+    uint32_t hash = seed ? seed : 0x%08Xu;
+    size_t i;
+    for (i = 0; i < length; i++) {
+        hash = (hash * 0x%08Xu) ^ (unsigned char)name[i];
+    }
+    return hash;
+}
+
+/* Id of the register, field or enum of the first length characters of name,
+   IPXACT_LOOKUP_NONE if there is none */
+uint32_t ipxact_lookup_id_n(const char *name, size_t length)
+{
+    int32_t displacement;
+    uint32_t slot;
+    uint32_t id;
+    if (ipxact_lookup_count == 0) {
+        return IPXACT_LOOKUP_NONE;
+    }
+    displacement = ipxact_lookup_displacements[ipxact_lookup_hash(0, name, length) %% ipxact_lookup_count];
+    if (displacement < 0) {
+        slot = (uint32_t)(-displacement - 1);
+    } else {
+        slot = ipxact_lookup_hash((uint32_t)displacement, name, length) %% ipxact_lookup_count;
+    }
+    id = ipxact_lookup_slots[slot];
+    if (strncmp(ipxact_lookup[id].name, name, length) != 0 || ipxact_lookup[id].name[length] != '\\0') {
+        return IPXACT_LOOKUP_NONE;
+    }
+    return id;
+}
+
+uint32_t ipxact_lookup_id(const char *name)
+{
+    return ipxact_lookup_id_n(name, strlen(name));
+}
+
+/* Name of the enum of a field with the given value, NULL if there is none */
+const char *ipxact_lookup_enum_name(uint32_t field, uint64_t value)
+{
+    uint32_t id;
+    for (id = field + 1; id < ipxact_lookup_count && ipxact_lookup[id].kind == IPXACT_LOOKUP_ENUM && ipxact_lookup[id].parent == field; id++) {
+        if (ipxact_lookup[id].value == value) {
+            return ipxact_lookup[id].name;
+        }
+    }
+    return NULL;
+}
+
+/* Looks up every name, returns the number of failures */
+int ipxact_lookup_selftest(void)
+{
+    uint32_t id;
+    int failures = 0;
+    for (id = 0; id < ipxact_lookup_count; id++) {
+        const char *name = ipxact_lookup[id].name;
+        if (ipxact_lookup_id(name) != id) {
+            failures++;
+        }
+        if (strlen(name) > 1 && ipxact_lookup_id_n(name, strlen(name) - 1) == id) {
+            failures++;
+        }
+        if (ipxact_lookup[id].kind == IPXACT_LOOKUP_ENUM && ipxact_lookup_enum_name(ipxact_lookup[id].parent, ipxact_lookup[id].value) == NULL) {
+            failures++;
+        }
+    }
+    return failures;
+}
+
+#ifdef IPXACT_LOOKUP_SELFTEST
+#include <stdio.h>
+
+int main(void)
+{
+    int failures = ipxact_lookup_selftest();
+    printf("ipxact lookup selftest: %%d failures in %%u names\\n", failures, (unsigned int)ipxact_lookup_count);
+    return failures != 0;
+}
+#endif
+''' % (C_LOOKUP_OFFSET_BASIS, C_LOOKUP_PRIME)
+
+# Textual names of the SPIRIT_*_T enums, in enum order. Used for the pooled
+# name tables in the metadata compilation unit.
+SPIRIT_TYPE_NAMES = [
+    ('accesstype', ['read-write', 'read-only', 'write-only', 'read-writeOnce', 'writeOnce']),
+    ('usagetype', ['memory', 'register', 'reserved']),
+    ('testconstrainttype', ['unConstrained', 'restore', 'writeAsRead', 'readOnly']),
+    ('modifiedwritevaluetype', ['oneToClear', 'oneToSet', 'oneToToggle', 'zeroToClear', 'zeroToSet', 'zeroToToggle', 'clear', 'set', 'modify']),
+    ('readactiontype', ['clear', 'set', 'modify']),
+    ('bool', ['false', 'true'])
+                     ]
+
 
 class intToHexStringError(Exception): 
     def __init__(self, message):
@@ -156,11 +341,132 @@ VHDL_SPIRIT_TYPES = '''
     );
     '''
     
+VHDL_BLOCK_HEADER = '''
+library ieee;
+use ieee.std_logic_1164.all;
+use ieee.math_real.all;
+use ieee.numeric_std.all;
+use work.regs.all;
+
+package regs_%s is
+'''
+
 VHDL_FOOTER = '''
 
 end package;
 '''
 
+PY_REGS_MODULE = '''
+
+_STRUCT_FORMATS = {8: "B", 16: "H", 32: "I", 64: "Q"}
+
+
+def _getStruct(size, byteOrder):
+    for width in sorted(_STRUCT_FORMATS):
+        if size <= width:
+            return struct.Struct(byteOrder + _STRUCT_FORMATS[width])
+    raise ValueError("Register size %d not supported" % size)
+
+
+class Registers(object):
+    """Register access through a memory mapping of path, i.e. /dev/mem,
+    /dev/uioN or a plain file of at least base + SPAN bytes.
+
+    All offsets, masks and shifts are precomputed, reads and writes go
+    straight to the mapping with struct.unpack_from/pack_into. Works with
+    Python 2.7 and 3."""
+
+    def __init__(self, path="/dev/mem", base=0, byteOrder="<", readonly=False):
+        self.base = base
+        pageOffset = base % mmap.ALLOCATIONGRANULARITY
+        flags = os.O_RDONLY if readonly else os.O_RDWR
+        if hasattr(os, "O_SYNC"):
+            flags |= os.O_SYNC
+        fd = os.open(path, flags)
+        try:
+            prot = mmap.PROT_READ if readonly else mmap.PROT_READ | mmap.PROT_WRITE
+            self._mmap = mmap.mmap(fd, pageOffset + SPAN, mmap.MAP_SHARED, prot, offset=base - pageOffset)
+        finally:
+            os.close(fd)
+        self._offset = pageOffset
+        self._registers = dict()
+        for name, (address, size, fields) in REGISTERS.items():
+            self._registers[name] = (pageOffset + address, _getStruct(size, byteOrder), fields)
+
+    def close(self):
+        """Unmap, or with views of view() still alive, unmap once they are released."""
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+        self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def read(self, name):
+        address, fmt, _ = self._registers[name]
+        return fmt.unpack_from(self._mmap, address)[0]
+
+    def write(self, name, value):
+        address, fmt, _ = self._registers[name]
+        fmt.pack_into(self._mmap, address, value)
+
+    def readField(self, name, field):
+        address, fmt, fields = self._registers[name]
+        shift, mask = fields[field]
+        return (fmt.unpack_from(self._mmap, address)[0] & mask) >> shift
+
+    def readFields(self, name):
+        """All fields of a register from a single read."""
+        return self.decode(name, self.read(name))
+
+    def decode(self, name, value):
+        fields = self._registers[name][2]
+        return dict((field, (value & mask) >> shift) for field, (shift, mask) in fields.items())
+
+    def update(self, name, **values):
+        """Read-modify-write of several fields of a register with one read and one write."""
+        address, fmt, fields = self._registers[name]
+        clear = 0
+        value = 0
+        for field, fieldValue in values.items():
+            shift, mask = fields[field]
+            clear |= mask
+            value |= (fieldValue << shift) & mask
+        fmt.pack_into(self._mmap, address, (fmt.unpack_from(self._mmap, address)[0] & ~clear) | value)
+
+    def updateMany(self, updates):
+        """Batched read-modify-write, updates maps register names to dicts of field values."""
+        for name, values in updates.items():
+            self.update(name, **values)
+
+    def view(self, block):
+        """Zero-copy view of an address block, a memoryview, or a read-only
+        buffer on Python 2.7."""
+        address, range_ = BLOCKS[block]
+        if sys.version_info[0] < 3:
+            return buffer(self._mmap, self._offset + address, range_)
+        return memoryview(self._mmap)[self._offset + address:self._offset + address + range_]
+
+    def snapshot(self, block=None):
+        """Copy of an address block, or of the whole map, as bytes."""
+        address, range_ = (0, SPAN) if block is None else BLOCKS[block]
+        return self._mmap[self._offset + address:self._offset + address + range_]
+
+    def snapshotRegisters(self, snapshot, block=None):
+        """Decode the register values of a snapshot taken with snapshot(block)."""
+        start = self._offset + (0 if block is None else BLOCKS[block][0])
+        values = dict()
+        for name, (address, fmt, _) in self._registers.items():
+            if 0 <= address - start <= len(snapshot) - fmt.size:
+                values[name] = fmt.unpack_from(snapshot, address - start)[0]
+        return values
+'''
+
 
 C_LRM = "IP-XACT Standard/D4, December 19, 2007"
 
@@ -189,7 +495,8 @@ C_DESC = {
     'READACTION'          : 'Read action',
     'TESTABLE'            : 'Is testable',
     'NUMBER'              : 'Register number',
-    'NUMBEROFREGS'        : 'Number of registers'
+    'NUMBEROFREGS'        : 'Number of registers',
+    'METAINDEX'           : 'Metadata table index'
           }
 
 C_POSTFIX = {
@@ -217,7 +524,8 @@ C_POSTFIX = {
     'READACTION'          : 'RDACT',
     'TESTABLE'            : 'TST',
     'NUMBER'              : 'NUM',
-    'NUMBEROFREGS'        : 'NUMREGS'
+    'NUMBEROFREGS'        : 'NUMREGS',
+    'METAINDEX'           : 'MIDX'
            }
 
 class CLIError(Exception):
@@ -264,16 +572,176 @@ def ifNotNoneReturnText(element):
     else:
         return None
  
-def openXMLFileReturnRoot(path):
+XML_CHUNK_SIZE = 1 << 16
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema", "spirit-1.5-memorymap.xsd")
+
+SCHEMA_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ipxact")
+
+schemas = dict()
+
+STDIO_PATH = "-"
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+COMPRESSION_SUFFIXES = (".gz", ".xz")
+
+def requireLzma():
+    if lzma is None:
+        raise CLIError("lzma (python 3 or backports.lzma) is required for .xz files")
+
+def splitCompressionSuffix(path):
+    '''Returns path without .gz/.xz suffix and the suffix, which is empty for
+    uncompressed paths.'''
+    base, suffix = os.path.splitext(path)
+    if suffix.lower() in COMPRESSION_SUFFIXES:
+        return base, suffix
+    return path, ""
+
+def normOutputPath(path):
+    if path is None or path == STDIO_PATH:
+        return path
+    return os.path.abspath(os.path.normpath(path))
+
+def getDecompressor(head):
+    '''Incremental decompressor for the stream starting with head, None for
+    uncompressed streams.'''
+    if head.startswith(GZIP_MAGIC):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if head.startswith(XZ_MAGIC):
+        requireLzma()
+        return lzma.LZMADecompressor()
+    return None
+
+def getInputChunks(f):
+    '''Generator of the contents of f in chunks of at most XML_CHUNK_SIZE
+    bytes read, gzip and xz streams are detected by their magic number and
+    decompressed on the fly.'''
+    chunk = f.read(XML_CHUNK_SIZE)
+    decompressor = getDecompressor(chunk)
+    while chunk:
+        if decompressor is None:
+            yield chunk
+        else:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+            # Concatenated gzip members each need a new decompressor
+            rest = getattr(decompressor, 'unused_data', b"")
+            if rest:
+                decompressor = getDecompressor(rest)
+                if decompressor is None:
+                    raise CLIError("Unexpected data after the end of the compressed stream")
+                chunk = rest
+                continue
+        chunk = f.read(XML_CHUNK_SIZE)
+    if decompressor is not None and hasattr(decompressor, 'flush'):
+        data = decompressor.flush()
+        if data:
+            yield data
+
+def openInputFile(path):
+    '''Open path for reading bytes, STDIO_PATH is stdin.'''
+    if path == STDIO_PATH:
+        return getattr(sys.stdin, 'buffer', sys.stdin)
     path = os.path.normpath(path)
-    if os.path.exists(os.path.abspath(path)):
-        log.info("Opening file: %s", path)
-        tree = etree.parse(path)
-        root = tree.getroot() 
-        return root
-    else:
+    if not os.path.exists(os.path.abspath(path)):
         raise IOError(2, "File does not exist, file:%s" % os.path.abspath(path))
-    
+    return open(path, "rb")
+
+def openOutputFile(path):
+    '''Open path for writing, compressed by its .gz/.xz suffix. Compressed
+    files get no timestamp, so unchanged content gives identical files.'''
+    if not os.path.exists(os.path.dirname(os.path.abspath(path))):
+        os.makedirs(os.path.dirname(os.path.abspath(path)))
+    suffix = splitCompressionSuffix(path)[1].lower()
+    if suffix == ".gz":
+        return gzip.GzipFile(path, "wb", mtime=0)
+    if suffix == ".xz":
+        requireLzma()
+        return lzma.LZMAFile(path, "wb")
+    return open(path, "w")
+
+def openTraceFile(path, mode="rb"):
+    '''Open a trace for reading, decompressed by its .gz/.xz suffix.
+    STDIO_PATH is stdin.'''
+    if path == STDIO_PATH:
+        return getattr(sys.stdin, 'buffer', sys.stdin) if "b" in mode else sys.stdin
+    suffix = splitCompressionSuffix(path)[1].lower()
+    if suffix == ".gz":
+        return gzip.GzipFile(path, "rb")
+    if suffix == ".xz":
+        requireLzma()
+        return lzma.LZMAFile(path, "rb")
+    return open(path, mode)
+
+def parseXMLFile(path, lowMemory=False):
+    '''Parse path, returns the root element and the sha256 hex digest of the
+    file contents, computed while feeding the parser. Compressed files are
+    decompressed while feeding the parser, the digest is of the uncompressed
+    document. STDIO_PATH reads the document from stdin. lowMemory drops
+    whitespace, comments and processing instructions from the tree.'''
+    f = openInputFile(path)
+    log.info("Opening file: %s", "stdin" if path == STDIO_PATH else os.path.normpath(path))
+    digest = hashlib.sha256()
+    if lowMemory:
+        parser = etree.XMLParser(remove_blank_text=True, remove_comments=True, remove_pis=True)
+    else:
+        parser = etree.XMLParser()
+    try:
+        for chunk in getInputChunks(f):
+            digest.update(chunk)
+            parser.feed(chunk)
+    finally:
+        if path != STDIO_PATH:
+            f.close()
+    return parser.close(), digest.hexdigest()
+
+def openXMLFileReturnRoot(path):
+    return parseXMLFile(path)[0]
+
+def getSchemaDigest(path=SCHEMA_PATH):
+    '''Digest of the schema source, validation results are cached by it.'''
+    if not os.path.exists(path):
+        raise IOError(2, "Schema does not exist, file:%s" % path)
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def getSchema(path=SCHEMA_PATH):
+    '''Compiled schema, compiled once per process.'''
+    path = os.path.abspath(os.path.normpath(path))
+    if path not in schemas:
+        if not os.path.exists(path):
+            raise IOError(2, "Schema does not exist, file:%s" % path)
+        log.info("Compiling schema: %s", path)
+        schemas[path] = etree.XMLSchema(etree.parse(path))
+    return schemas[path]
+
+def validateSchema(root, digest, schemaPath=SCHEMA_PATH, cacheDir=SCHEMA_CACHE_DIR):
+    '''Validate the document of root against the schema. Documents that
+    passed are remembered by content digest in cacheDir and not validated
+    again, the schema is only compiled when needed. Raises CLIError listing
+    the schema violations.'''
+    cachePath = None
+    if cacheDir is not None:
+        cachePath = os.path.join(cacheDir, hashlib.sha256((getSchemaDigest(schemaPath) + digest).encode('ascii')).hexdigest())
+        if os.path.exists(cachePath):
+            log.info("Schema validation cached: %s", cachePath)
+            return
+
+    schema = getSchema(schemaPath)
+    if not schema.validate(root.getroottree()):
+        errors = ["line %d: %s" % (error.line, error.message) for error in schema.error_log]
+        raise CLIError("Schema validation failed:\n  " + "\n  ".join(errors))
+
+    if cachePath is not None:
+        if not os.path.exists(cacheDir):
+            os.makedirs(cacheDir)
+        open(cachePath, "w").close()
+
+
      
 def convAccessTypeToDefine(accessTypeString):
     if accessTypeString == "read-write":
@@ -391,6 +859,15 @@ def getScaledInteger(inStr):
     
     return dec * mult * neg
 
+def isScaledInteger(inStr):
+    '''True if inStr is a plain IP-XACT integer, i.e. 0x1F, 31, 4k. #1F is
+    no plain integer, it is evaluated as an expression.'''
+    try:
+        getScaledInteger(inStr.strip())
+    except Exception:
+        return False
+    return True
+
 def getScaledNonNegativeInteger(inStr):
     if inStr == None:
         return inStr
@@ -422,6 +899,369 @@ def getScalarFromString(scaledString):
         multiplier = 1 
     return multiplier
 
+class ExpressionError(Exception):
+    def __init__(self, message):
+        Exception.__init__(self, "'%s'" % (message))
+
+# Tags whose text is a number and may be given as an expression
+EXPRESSION_TAGS = set(IPXACT_NS + tag for tag in ('baseAddress', 'range', 'width', 'addressOffset', 'size', 'dim',
+                                                  'bitOffset', 'bitWidth'))
+
+# value and mask are only numeric below these elements, model parameter and
+# other values may hold arbitrary strings.
+EXPRESSION_PARENT_TAGS = {
+    IPXACT_NS + 'value': set([IPXACT_NS + 'reset', IPXACT_NS + 'enumeratedValue']),
+    IPXACT_NS + 'mask': set([IPXACT_NS + 'reset']),
+}
+
+def isExpressionElement(element):
+    '''True for the numeric memory map elements that may hold expressions.'''
+    if element.tag in EXPRESSION_TAGS:
+        return True
+    parent = element.getparent()
+    return element.tag in EXPRESSION_PARENT_TAGS and parent is not None and parent.tag in EXPRESSION_PARENT_TAGS[element.tag]
+
+EXPRESSION_TOKEN_RE = re.compile(r'''\s*(?:
+    (?P<based>(?:\d+)?'[sS]?[hHdDbBoO][0-9a-fA-F_]+(?![\w'])) |
+    (?P<number>(?:0[xX][0-9a-fA-F]+|\#[0-9a-fA-F]+|\d+)[kKmMgGtT]?) |
+    (?P<name>\$?[A-Za-z_][A-Za-z0-9_]*) |
+    (?P<string>'[^']*'|"[^"]*") |
+    (?P<op>\*\*|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^~!<>?:(),])
+    )''', re.VERBOSE)
+
+# Binary operators by precedence, ** is right associative
+EXPRESSION_BINARY_OPS = {
+    '||': 1, '&&': 2, '|': 3, '^': 4, '&': 5, '==': 6, '!=': 6,
+    '<': 7, '<=': 7, '>': 7, '>=': 7, '<<': 8, '>>': 8,
+    '+': 9, '-': 9, '*': 10, '/': 10, '%': 10, '**': 11
+                         }
+
+def tokenizeExpression(expression):
+    tokens = list()
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = EXPRESSION_TOKEN_RE.match(expression, position)
+        if match is None or match.end() == position:
+            raise ExpressionError("Cannot parse expression \"%s\" at \"%s\"" % (expression, expression[position:]))
+        position = match.end()
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+    return tokens
+
+EXPRESSION_BASED_RE = re.compile(r"(\d+)?'[sS]?([hHdDbBoO])([0-9a-fA-F_]+)")
+
+EXPRESSION_BASES = {'h': 16, 'd': 10, 'b': 2, 'o': 8}
+
+# Element values written in decimal, all others are written in hex
+EXPRESSION_DECIMAL_TAGS = set(IPXACT_NS + tag for tag in ('range', 'width', 'size', 'dim', 'bitOffset', 'bitWidth'))
+
+def parseExpressionNumber(kind, text):
+    if kind == 'based':
+        match = EXPRESSION_BASED_RE.match(text)
+        return int(match.group(3).replace('_', ''), EXPRESSION_BASES[match.group(2).lower()])
+    if text[0] == '#':
+        text = '0x' + text[1:]
+    return getScaledInteger(text)
+
+def parseExpression(expression):
+    '''Parse an IP-XACT expression into a tree of tuples: ('num', value),
+    ('ref', name), ('unary', op, a), ('binary', op, a, b), ('cond', c, a, b)
+    and ('call', function, args). Parameters are referenced by name or
+    with id('name').'''
+    tokens = tokenizeExpression(expression)
+    position = [0]
+
+    def peek():
+        return tokens[position[0]] if position[0] < len(tokens) else (None, None)
+
+    def take(op=None):
+        token = peek()
+        if token[0] is None or (op is not None and token != ('op', op)):
+            raise ExpressionError("Expected %s in expression \"%s\"" % (op or "operand", expression))
+        position[0] += 1
+        return token
+
+    def primary():
+        kind, text = take()
+        if kind in ('based', 'number'):
+            return ('num', parseExpressionNumber(kind, text))
+        if kind == 'name':
+            if peek() == ('op', '('):
+                take('(')
+                args = list()
+                while peek() != ('op', ')'):
+                    if peek()[0] == 'string':
+                        args.append(('str', take()[1][1:-1]))
+                    else:
+                        args.append(conditional())
+                    if peek() == ('op', ','):
+                        take(',')
+                take(')')
+                if text == 'id':
+                    if len(args) != 1 or args[0][0] != 'str':
+                        raise ExpressionError("id() takes one parameter id in expression \"%s\"" % expression)
+                    return ('ref', args[0][1])
+                return ('call', text, args)
+            return ('ref', text)
+        if (kind, text) == ('op', '('):
+            node = conditional()
+            take(')')
+            return node
+        if kind == 'op' and text in ('-', '+', '~', '!'):
+            return ('unary', text, primary())
+        raise ExpressionError("Unexpected \"%s\" in expression \"%s\"" % (text, expression))
+
+    def binary(minPrecedence):
+        node = primary()
+        while True:
+            kind, text = peek()
+            if kind != 'op' or text not in EXPRESSION_BINARY_OPS or EXPRESSION_BINARY_OPS[text] < minPrecedence:
+                return node
+            take()
+            precedence = EXPRESSION_BINARY_OPS[text]
+            node = ('binary', text, node, binary(precedence if text == '**' else precedence + 1))
+
+    def conditional():
+        node = binary(1)
+        if peek() == ('op', '?'):
+            take('?')
+            whenTrue = conditional()
+            take(':')
+            node = ('cond', node, whenTrue, conditional())
+        return node
+
+    node = conditional()
+    if position[0] != len(tokens):
+        raise ExpressionError("Unexpected \"%s\" in expression \"%s\"" % (tokens[position[0]][1], expression))
+    return node
+
+def getExpressionRefs(node, refs=None):
+    '''Names of the parameters an expression tree references.'''
+    if refs is None:
+        refs = set()
+    if node[0] == 'ref':
+        refs.add(node[1])
+    elif node[0] == 'unary':
+        getExpressionRefs(node[2], refs)
+    elif node[0] == 'binary':
+        getExpressionRefs(node[2], refs)
+        getExpressionRefs(node[3], refs)
+    elif node[0] == 'cond':
+        for child in node[1:]:
+            getExpressionRefs(child, refs)
+    elif node[0] == 'call':
+        for child in node[2]:
+            getExpressionRefs(child, refs)
+    return refs
+
+def divideTowardZero(a, b):
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+EXPRESSION_BINARY_FUNCS = {
+    '||': lambda a, b: int(bool(a) or bool(b)), '&&': lambda a, b: int(bool(a) and bool(b)),
+    '|': lambda a, b: a | b, '^': lambda a, b: a ^ b, '&': lambda a, b: a & b,
+    '==': lambda a, b: int(a == b), '!=': lambda a, b: int(a != b),
+    '<': lambda a, b: int(a < b), '<=': lambda a, b: int(a <= b), '>': lambda a, b: int(a > b), '>=': lambda a, b: int(a >= b),
+    '<<': lambda a, b: a << b, '>>': lambda a, b: a >> b,
+    '+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b,
+    '/': divideTowardZero, '%': lambda a, b: a - b * divideTowardZero(a, b), '**': lambda a, b: a ** b
+                          }
+
+EXPRESSION_FUNCS = {
+    '$clog2': lambda a: (a - 1).bit_length() if a > 0 else 0,
+    '$pow': lambda a, b: a ** b,
+    '$max': max,
+    '$min': min
+                    }
+
+
+class ParameterResolver():
+    '''Evaluates the parameters of a component and the expressions of its
+    numeric elements (baseAddress, range, bitWidth, ...). Each parameter is
+    evaluated once and memoized, dependency cycles are reported. Overriding a
+    parameter only re-evaluates the parameters and elements depending on it.
+
+    Parameters are spirit:parameter elements, referenced by name or by the
+    spirit:id of their value, and numeric elements with a spirit:id
+    attribute. Elements get their expression from a spirit:dependency
+    attribute, or from their text if it is not a plain IP-XACT integer, and
+    are rewritten with the plain value; plain integers keep their text.
+    Text that does not parse, or references names that are no parameter, is
+    kept as a string and only fails when its value is needed.'''
+    def __init__(self, root):
+        self.expressions = dict()
+        self.aliases = dict()
+        self.values = dict()
+        self.dependents = dict()
+        self.bindings = list()
+        self.bindingsByRef = dict()
+        self.evaluating = list()
+
+        parameters = list()
+        for parameterElement in root.iter(IPXACT_NS + 'parameter'):
+            name = ifNotNoneReturnText(parameterElement.find(IPXACT_NS + 'name'))
+            valueElement = parameterElement.find(IPXACT_NS + 'value')
+            if name is None or valueElement is None:
+                continue
+            parameters.append((name, valueElement))
+            if valueElement.get(IPXACT_NS + 'id') not in (None, name):
+                self.aliases[valueElement.get(IPXACT_NS + 'id')] = name
+        elements = [element for element in root.iter() if isExpressionElement(element)]
+        self.known = set([name for name, _ in parameters]) | set(self.aliases)
+        self.known |= set([element.get(IPXACT_NS + 'id') for element in elements if element.get(IPXACT_NS + 'id') is not None])
+        for name, valueElement in parameters:
+            self.setExpression(name, self.getElementExpression(valueElement))
+
+        for element in elements:
+            parameterId = element.get(IPXACT_NS + 'id')
+            expression = self.getElementExpression(element)
+            if parameterId is not None:
+                self.setExpression(parameterId, expression)
+            # Plain integers are only rewritten if a dependency or override changes them
+            plain = element.text is not None and isScaledInteger(element.text)
+            if expression is None or expression[0] == 'str' or (plain and parameterId is None and element.get(IPXACT_NS + 'dependency') is None):
+                continue
+            if parameterId is not None:
+                expression = ('ref', parameterId)
+            self.bindings.append((element, expression, element.text if plain else None))
+            for ref in self.getRefs(expression):
+                self.bindingsByRef.setdefault(ref, list()).append(len(self.bindings) - 1)
+        self.defaults = dict(self.expressions)
+
+    def getRefs(self, expression):
+        return set(self.aliases.get(ref, ref) for ref in getExpressionRefs(expression))
+
+    def getElementExpression(self, element):
+        dependency = element.get(IPXACT_NS + 'dependency')
+        text = dependency if dependency is not None else element.text
+        if text is None:
+            return None
+        try:
+            return ('num', getScaledInteger(text.strip()))
+        except Exception:
+            pass
+        try:
+            expression = parseExpression(text)
+        except ExpressionError:
+            if dependency is not None:
+                raise
+            return ('str', text)
+        if dependency is None and not self.getRefs(expression) <= self.known:
+            return ('str', text)
+        return expression
+
+    def setExpression(self, name, expression):
+        if name in self.expressions and self.expressions[name] is not None and self.expressions[name][0] != 'str':
+            for ref in self.getRefs(self.expressions[name]):
+                self.dependents.get(ref, set()).discard(name)
+        self.expressions[name] = expression
+        if expression is not None and expression[0] != 'str':
+            for ref in self.getRefs(expression):
+                self.dependents.setdefault(ref, set()).add(name)
+
+    def value(self, name):
+        name = self.aliases.get(name, name)
+        if name in self.values:
+            return self.values[name]
+        if name in self.evaluating:
+            raise CLIError("Parameter dependency cycle: %s" % " -> ".join(self.evaluating[self.evaluating.index(name):] + [name]))
+        if self.expressions.get(name) is None:
+            raise CLIError("Unknown parameter '%s'" % name)
+        self.evaluating.append(name)
+        try:
+            value = self.evaluate(self.expressions[name])
+        except ZeroDivisionError:
+            raise CLIError("Division by zero in parameter '%s'" % name)
+        finally:
+            self.evaluating.pop()
+        self.values[name] = value
+        return value
+
+    def evaluate(self, node):
+        kind = node[0]
+        if kind == 'num':
+            return node[1]
+        if kind == 'ref':
+            return self.value(node[1])
+        if kind == 'unary':
+            value = self.evaluate(node[2])
+            return {'-': -value, '+': value, '~': ~value, '!': int(not value)}[node[1]]
+        if kind == 'binary':
+            return EXPRESSION_BINARY_FUNCS[node[1]](self.evaluate(node[2]), self.evaluate(node[3]))
+        if kind == 'cond':
+            return self.evaluate(node[2]) if self.evaluate(node[1]) else self.evaluate(node[3])
+        if kind == 'call':
+            if node[1] not in EXPRESSION_FUNCS:
+                raise CLIError("Unknown function '%s'" % node[1])
+            return EXPRESSION_FUNCS[node[1]](*[self.evaluate(arg) for arg in node[2]])
+        raise CLIError("Not a numeric expression: %s" % node[1])
+
+    def override(self, name, text):
+        '''Set a parameter to a new value or expression, returns the names of
+        the parameters whose value may have changed.'''
+        name = self.aliases.get(name, name)
+        if name not in self.expressions:
+            raise CLIError("Unknown parameter '%s'" % name)
+        self.setExpression(name, parseExpression(text))
+        return self.invalidate(name)
+
+    def restore(self, name):
+        '''Set an overridden parameter back to its expression in the tree,
+        returns the names of the parameters whose value may have changed.'''
+        name = self.aliases.get(name, name)
+        self.setExpression(name, self.defaults[name])
+        return self.invalidate(name)
+
+    def invalidate(self, name):
+        affected = set([name])
+        stack = [name]
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        for affectedName in affected:
+            self.values.pop(affectedName, None)
+        return affected
+
+    def resolve(self, affected=None):
+        '''Write the values of the element expressions into the tree, all of
+        them or only those referencing the affected parameters.'''
+        if affected is None:
+            indices = range(len(self.bindings))
+        else:
+            indices = sorted(set(index for name in affected for index in self.bindingsByRef.get(name, ())))
+        for index in indices:
+            element, expression, plainText = self.bindings[index]
+            try:
+                value = self.evaluate(expression)
+            except ZeroDivisionError:
+                raise CLIError("Division by zero in %s \"%s\"" % (element.tag.replace(IPXACT_NS, ''), element.get(IPXACT_NS + 'dependency', element.text)))
+            if plainText is not None and getScaledInteger(plainText.strip()) == value:
+                element.text = plainText
+            elif value < 0 or element.tag in EXPRESSION_DECIMAL_TAGS:
+                element.text = str(value)
+            else:
+                element.text = "0x%X" % value
+        return len(indices)
+
+    def overrideAndResolve(self, overrides, previous=None):
+        '''Apply a dict of parameter overrides and update the affected
+        elements. Parameters overridden in the previous dict but not in
+        overrides are restored.'''
+        overrides = dict((self.aliases.get(name, name), text) for name, text in overrides.items())
+        previous = dict((self.aliases.get(name, name), text) for name, text in (previous or {}).items())
+        affected = set()
+        for name in previous:
+            if name not in overrides:
+                affected |= self.restore(name)
+        for name, text in overrides.items():
+            if previous.get(name) != text:
+                affected |= self.override(name, text)
+        return self.resolve(affected)
+
+
 class formatEnum:
     hex = "hex"
     bin = "bin"
@@ -480,6 +1320,21 @@ def getRegisterNum(thisRegisterElement):
                 else:
                     return num
 
+def getElementSortKey(xmlkey):
+    return lambda element: getScaledNonNegativeInteger(ifNotNoneReturnText(element.find(xmlkey)))
+
+def getRegisterNumbers(root):
+    '''Register numbers of all registers in root, as returned by getRegisterNum, in one pass.'''
+    numbers = dict()
+    num = 0
+    addressBlockElementList = sorted(getAddressBlockElementList(root), key=getElementSortKey(IPXACT_NS + 'baseAddress'))
+    for addressBlockElement in addressBlockElementList:
+        registerElementList = sorted(addressBlockElement.findall(IPXACT_NS + "register"), key=getElementSortKey(IPXACT_NS + 'addressOffset'))
+        for registerElement in registerElementList:
+            numbers[registerElement] = num
+            num = num + 1
+    return numbers
+
 def getPostfix(string, abbreviate):  
     if abbreviate:
         return C_POSTFIX[string]
@@ -527,7 +1382,8 @@ def getFieldStringsAsList(fieldElement, conf):
     modifiedWriteValue = ifNotNoneReturnText(fieldElement.find(IPXACT_NS + 'modifiedWriteValue'))
     readAction = ifNotNoneReturnText(fieldElement.find(IPXACT_NS + 'readAction'))
     testable = ifNotNoneReturnText(fieldElement.find(IPXACT_NS + 'testable'))
-    testConstraint = fieldElement.find(IPXACT_NS + 'testable').attrib[IPXACT_NS + 'testConstraint']
+    testableElement = fieldElement.find(IPXACT_NS + 'testable')
+    testConstraint = testableElement.get(IPXACT_NS + 'testConstraint') if testableElement is not None else None
 
     fieldList = list()
     
@@ -584,7 +1440,7 @@ def getFieldStringsAsList(fieldElement, conf):
 
 
 
-def getRegisterStringsAsList(registerElement, conf):
+def getRegisterStringsAsList(registerElement, conf, number=None):
     name = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'name'))
     description = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'description'))
     dim = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'dim'))
@@ -595,7 +1451,8 @@ def getRegisterStringsAsList(registerElement, conf):
     access = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'access'))
     resetValue = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'reset/' + IPXACT_NS + 'value'))
     resetMask = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'reset/' + IPXACT_NS + 'mask'))
-    number = getRegisterNum(registerElement)
+    if number is None:
+        number = getRegisterNum(registerElement)
                             
     regList = list()
     if conf.args.c:
@@ -722,179 +1579,1977 @@ def getAddressBlockStringsAsList(addressBlockElement, conf):
   
   
 
+def abElementPrint(addressBlockElement, compName, conf):
+    abStringsList = getAddressBlockStringsAsList(addressBlockElement, conf)
+    if conf.args.c and conf.cMeta is not None:
+        cMetaPoolStrings(abStringsList, 'ab', conf)
+    abColumnMaxLengths = getMaxLengtOfColumnsAsList(abStringsList)
+    abName = ifNotNoneReturnText(addressBlockElement.find(IPXACT_NS + 'name'))
+
+    printStr = ""
+
+    if conf.args.vhdl:
+        printStr += "\n\n-- Addressblock " + abName + " --"
+        formatStr = "constant "
+        if not conf.args.noComponentNameInAb:
+            formatStr += compName.upper() + "_"
+        formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(abName.upper(), "0:<" + str(abColumnMaxLengths[0]), "1:<" + str(abColumnMaxLengths[1]), "2:<")
+    elif conf.args.c:
+        printStr += "\n\n/* Addressblock " + abName + " */"
+        formatStr = "#define {0}_{1}_{{{2}}}\t{{{3}}}\t{{{4}}}".format(compName.upper(), abName.upper(), "0:<" + str(abColumnMaxLengths[0]), "1:<" + str(abColumnMaxLengths[1]), "2:<" + str(abColumnMaxLengths[2]))
+
+    for abStrings in abStringsList:
+        printStr += "\n" + formatStr.format(abStrings[0], abStrings[1], abStrings[2])
+
+    return printStr
+
 def abPrint(root, conf):
-    addressBlockElementList = getAddressBlockElementList(root)
-    
+    compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
     printStr = ""
+    for addressBlockElement in getAddressBlockElementList(root):
+        printStr += abElementPrint(addressBlockElement, compName, conf)
+    return printStr
+
+def regElementPrint(registerElement, compName, conf, number=None):
+    regStringsList = getRegisterStringsAsList(registerElement, conf, number)
+    if conf.args.c and conf.cMeta is not None:
+        cMetaPoolStrings(regStringsList, 'reg', conf)
+    regColumnMaxLengths = getMaxLengtOfColumnsAsList(regStringsList)
+    abName = ifNotNoneReturnText(registerElement.find("../%sname" % IPXACT_NS))
+    regName = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'name'))
+
+    printStr = ""
+
+    if conf.args.vhdl:
+        printStr += "\n\n-- Register " + regName + " --"
+        formatStr = "constant "
+        if not conf.args.noComponentNameInReg:
+            formatStr += compName.upper() + "_"
+        if not conf.args.noAddressBlockNameInReg:
+            formatStr += abName.upper() + "_"   
+        formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(regName.upper(), "0:<" + str(regColumnMaxLengths[0]), "1:<" + str(regColumnMaxLengths[1]), "2:<")
+    elif conf.args.c:
+        printStr += "\n\n/* Register " + regName + " */"
+        formatStr = "#define {0}_{1}_{2}_{{{3}}}\t{{{4}}}\t{{{5}}}".format(compName.upper(), abName.upper(), regName.upper(), "0:<" + str(regColumnMaxLengths[0]), "1:<" + str(regColumnMaxLengths[1]), "2:<" + str(regColumnMaxLengths[2]))
+
+    for regStrings in regStringsList:
+        printStr += "\n" + formatStr.format(regStrings[0], regStrings[1], regStrings[2])
 
-    for addressBlockElement in addressBlockElementList:
-        abStringsList = getAddressBlockStringsAsList(addressBlockElement, conf)
-        abColumnMaxLengths = getMaxLengtOfColumnsAsList(abStringsList)
-        compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
-        abName = ifNotNoneReturnText(addressBlockElement.find(IPXACT_NS + 'name'))
-        
-        if conf.args.vhdl:
-            printStr += "\n\n-- Addressblock " + abName + " --"
-            formatStr = "constant "
-            if not conf.args.noComponentNameInAb:
-                formatStr += compName.upper() + "_"
-            formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(abName.upper(), "0:<" + str(abColumnMaxLengths[0]), "1:<" + str(abColumnMaxLengths[1]), "2:<")
-        elif conf.args.c:
-            printStr += "\n\n/* Addressblock " + abName + " */"
-            formatStr = "#define {0}_{1}_{{{2}}}\t{{{3}}}\t{{{4}}}".format(compName.upper(), abName.upper(), "0:<" + str(abColumnMaxLengths[0]), "1:<" + str(abColumnMaxLengths[1]), "2:<" + str(abColumnMaxLengths[2]))
-        
-        
-        for abStrings in abStringsList:
-            if conf.args.vhdl:
-                printStr += "\n" + formatStr.format(abStrings[0], abStrings[1], abStrings[2])
-            elif conf.args.c:
-                printStr += "\n" + formatStr.format(abStrings[0], abStrings[1], abStrings[2])
-            
     return printStr
 
 def regPrint(root, conf):
-    registerElementList = getRegisterElementList(root)
-    
+    compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
+    registerNumbers = getRegisterNumbers(root)
     printStr = ""
-    
-    for registerElement in registerElementList:
-        regStringsList = getRegisterStringsAsList(registerElement, conf)
-        regColumnMaxLengths = getMaxLengtOfColumnsAsList(regStringsList)
-        compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
-        abName = ifNotNoneReturnText(registerElement.find("../%sname" % IPXACT_NS))
-        regName = ifNotNoneReturnText(registerElement.find(IPXACT_NS + 'name'))
-        if conf.args.vhdl:
-            printStr += "\n\n-- Register " + regName + " --"
-            formatStr = "constant "
-            if not conf.args.noComponentNameInReg:
-                formatStr += compName.upper() + "_"
-            if not conf.args.noAddressBlockNameInReg:
-                formatStr += abName.upper() + "_"   
-            formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(regName.upper(), "0:<" + str(regColumnMaxLengths[0]), "1:<" + str(regColumnMaxLengths[1]), "2:<")
-        elif conf.args.c:
-            printStr += "\n\n/* Register " + regName + " */"
-            formatStr = "#define {0}_{1}_{2}_{{{3}}}\t{{{4}}}\t{{{5}}}".format(compName.upper(), abName.upper(), regName.upper(), "0:<" + str(regColumnMaxLengths[0]), "1:<" + str(regColumnMaxLengths[1]), "2:<" + str(regColumnMaxLengths[2]))
-                  
-        for regStrings in regStringsList:
-            if conf.args.vhdl:
-                printStr += "\n" + formatStr.format(regStrings[0], regStrings[1], regStrings[2])
-            elif conf.args.c:
-                printStr += "\n" + formatStr.format(regStrings[0], regStrings[1], regStrings[2])
-            
+    for registerElement in getRegisterElementList(root):
+        printStr += regElementPrint(registerElement, compName, conf, registerNumbers.get(registerElement))
+    return printStr
+
+def enumElementPrint(enumElement, conf):
+    enumStringsList = getEnumStringsAsList(enumElement, conf)
+    enumColumnMaxLengths = getMaxLengtOfColumnsAsList(enumStringsList)
+    abName = ifNotNoneReturnText(enumElement.find("../../../%sname" % IPXACT_NS))
+    regName = ifNotNoneReturnText(enumElement.find("../../%sname" % IPXACT_NS))
+    fieldName = ifNotNoneReturnText(enumElement.find("../%sname" % IPXACT_NS))
+
+    printStr = ""
+
+    if conf.args.vhdl:
+        formatStr = "constant "
+        if not conf.args.noAddressBlockNameInField:
+            formatStr += abName.upper() + "_"
+        if not conf.args.noRegisterNameInField:
+            formatStr += regName.upper() + "_" 
+        formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(fieldName.upper(), "0:<" + str(enumColumnMaxLengths[0]), "1:<" + str(enumColumnMaxLengths[1]), "2:<")
+    elif conf.args.c:
+        formatStr = "\t {0}_{1}_{2}_{3} = {4}"
+
+    if conf.args.vhdl:
+        printStr += "\n\n-- enum " + fieldName + " --"
+        for enumStrings in enumStringsList:
+            printStr += "\n" + formatStr.format(enumStrings[0].upper(), enumStrings[1], enumStrings[2])
+    elif conf.args.c:
+        printStr += "\n\n/* enum " + fieldName + " */"
+        printStr += "\n typedef enum {\n"
+        for enumStrings in enumStringsList:
+            printStr += formatStr.format(abName.upper(), regName.upper(), fieldName.upper(), enumStrings[0].upper(), enumStrings[1])
+            if enumStrings != enumStringsList[-1]:
+                printStr += ","
+            printStr += "\n"      
+        printStr += "} " + "{0}_{1}_{2}_ENUM;".format(abName.upper(), regName.upper(), fieldName.upper())
+
     return printStr
 
 def enumsPrint(root, conf):
-    enumElementList = getEnumElementList(root)
-    
     printStr = ""
-    
-    for enumElement in enumElementList:
-        enumStringsList = getEnumStringsAsList(enumElement, conf)
-        enumColumnMaxLengths = getMaxLengtOfColumnsAsList(enumStringsList)
-#       compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
-        abName = ifNotNoneReturnText(enumElement.find("../../../%sname" % IPXACT_NS))
-        regName = ifNotNoneReturnText(enumElement.find("../../%sname" % IPXACT_NS))
-        fieldName = ifNotNoneReturnText(enumElement.find("../%sname" % IPXACT_NS))
-        
-        if conf.args.vhdl:
-            formatStr = "constant "
-            if not conf.args.noAddressBlockNameInField:
-                formatStr += abName.upper() + "_"
-            if not conf.args.noRegisterNameInField:
-                formatStr += regName.upper() + "_" 
-            formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(fieldName.upper(), "0:<" + str(enumColumnMaxLengths[0]), "1:<" + str(enumColumnMaxLengths[1]), "2:<")
-        elif conf.args.c:
-            formatStr = "\t {0}_{1}_{2}_{3} = {4}"
-            
-            
-    
-        if conf.args.vhdl:
-            printStr += "\n\n-- enum " + fieldName + " --"
-            for enumStrings in enumStringsList:
-                printStr += "\n" + formatStr.format(enumStrings[0].upper(), enumStrings[1], enumStrings[2])
-        elif conf.args.c:
-            printStr += "\n\n/* enum " + fieldName + " */"
-            printStr += "\n typedef enum {\n"
-            for enumStrings in enumStringsList:
-                printStr += formatStr.format(abName.upper(), regName.upper(), fieldName.upper(), enumStrings[0].upper(), enumStrings[1])
-                if enumStrings != enumStringsList[-1]:
-                    printStr += ","
-                printStr += "\n"      
-            printStr += "} " + "{0}_{1}_{2}_ENUM;".format(abName.upper(), regName.upper(), fieldName.upper())
-            
+    for enumElement in getEnumElementList(root):
+        printStr += enumElementPrint(enumElement, conf)
+    return printStr
+
+def fieldElementPrint(fieldElement, compName, conf):
+    fieldStringsList = getFieldStringsAsList(fieldElement, conf)
+    if conf.args.c and conf.cMeta is not None:
+        cMetaPoolStrings(fieldStringsList, 'field', conf)
+    fieldColumnMaxLengths = getMaxLengtOfColumnsAsList(fieldStringsList)
+    abName = ifNotNoneReturnText(fieldElement.find("../../%sname" % IPXACT_NS))
+    regName = ifNotNoneReturnText(fieldElement.find("../%sname" % IPXACT_NS))
+    fieldName = ifNotNoneReturnText(fieldElement.find(IPXACT_NS + 'name'))
+
+    printStr = ""
+
+    if conf.args.vhdl:
+        printStr += "\n\n-- Field " + fieldName + " --"
+        formatStr = "constant "
+        if not conf.args.noComponentNameInField:
+            formatStr += compName.upper() + "_"
+        if not conf.args.noAddressBlockNameInField:
+            formatStr += abName.upper() + "_"
+        if not conf.args.noRegisterNameInField:
+            formatStr += regName.upper() + "_" 
+        formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(fieldName.upper(), "0:<" + str(fieldColumnMaxLengths[0]), "1:<" + str(fieldColumnMaxLengths[1]), "2:<")
+    elif conf.args.c:
+        printStr += "\n\n/* Field " + fieldName + " */"
+        formatStr = "#define {0}_{1}_{2}_{3}_{{{4}}}\t{{{5}}}\t{{{6}}}".format(compName.upper(), abName.upper(), regName.upper(), fieldName.upper(), "0:<" + str(fieldColumnMaxLengths[0]), "1:<" + str(fieldColumnMaxLengths[1]), "2:<" + str(fieldColumnMaxLengths[2]))
+
+    for fieldStrings in fieldStringsList:
+        printStr += "\n" + formatStr.format(fieldStrings[0], fieldStrings[1], fieldStrings[2])
+
     return printStr
 
 def fieldsPrint(root, conf):
-    fieldElementList = getFieldElementList(root)
-    
+    compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
     printStr = ""
-    
-    for fieldElement in fieldElementList:
-        fieldStringsList = getFieldStringsAsList(fieldElement, conf)
-        fieldColumnMaxLengths = getMaxLengtOfColumnsAsList(fieldStringsList)
-        compName = ifNotNoneReturnText(root.find('./' + IPXACT_NS + 'name'))
-        abName = ifNotNoneReturnText(fieldElement.find("../../%sname" % IPXACT_NS))
-        regName = ifNotNoneReturnText(fieldElement.find("../%sname" % IPXACT_NS))
-        fieldName = ifNotNoneReturnText(fieldElement.find(IPXACT_NS + 'name'))
-        if conf.args.vhdl:
-            printStr += "\n\n-- Field " + fieldName + " --"
-            formatStr = "constant "
-            if not conf.args.noComponentNameInField:
-                formatStr += compName.upper() + "_"
-            if not conf.args.noAddressBlockNameInField:
-                formatStr += abName.upper() + "_"
-            if not conf.args.noRegisterNameInField:
-                formatStr += regName.upper() + "_" 
-            formatStr += "{0}_{{{1}}} {{{2}}} := {{{3}}};".format(fieldName.upper(), "0:<" + str(fieldColumnMaxLengths[0]), "1:<" + str(fieldColumnMaxLengths[1]), "2:<")
-        elif conf.args.c:
-            printStr += "\n\n/* Field " + fieldName + " */"
-            formatStr = "#define {0}_{1}_{2}_{3}_{{{4}}}\t{{{5}}}\t{{{6}}}".format(compName.upper(), abName.upper(), regName.upper(), fieldName.upper(), "0:<" + str(fieldColumnMaxLengths[0]), "1:<" + str(fieldColumnMaxLengths[1]), "2:<" + str(fieldColumnMaxLengths[2]))
-    
-        for fieldStrings in fieldStringsList:
-            if conf.args.vhdl:
-                printStr += "\n" + formatStr.format(fieldStrings[0], fieldStrings[1], fieldStrings[2])
-            elif conf.args.c:
-                printStr += "\n" + formatStr.format(fieldStrings[0], fieldStrings[1], fieldStrings[2])
-            
+    for fieldElement in getFieldElementList(root):
+        printStr += fieldElementPrint(fieldElement, compName, conf)
     return printStr
                     
             
 class Config():
     def __init__(self, args):
         self.args = args
-    
+        self.cMeta = None
+
+
+class CStringPool():
+    '''Deduplicated table of NUL terminated strings, addressed by byte offset.'''
+    def __init__(self):
+        self.offsets = dict()
+        self.strings = list()
+        self.size = 0
+
+    def add(self, string):
+        if string is None:
+            return C_META_NONE
+        if string not in self.offsets:
+            self.offsets[string] = self.size
+            self.strings.append(string)
+            if isinstance(string, bytes):
+                self.size += len(string) + 1
+            else:
+                self.size += len(string.encode('utf-8')) + 1
+        return self.offsets[string]
+
+
+class CMetadata():
+    '''Textual metadata moved out of the C header into its own compilation
+    unit. With a suffix, the string pool and tables are those of a single
+    address block, named ipxact_strtab<suffix> and ipxact_<kind>_meta<suffix>.'''
+    def __init__(self, suffix=""):
+        self.suffix = suffix
+        self.strtab = C_META_STRTAB + suffix
+        self.pool = CStringPool()
+        self.tables = {'ab': list(), 'reg': list(), 'field': list()}
+
+    def declarationsPrint(self):
+        printStr = "\nextern const char %s[];\n" % self.strtab
+        for kind in ('ab', 'reg', 'field'):
+            printStr += "extern const IPXACT_META_T ipxact_%s_meta%s[];\n" % (kind, self.suffix)
+        return printStr
+
+    def addRow(self, kind, row):
+        self.tables[kind].append(row)
+        return len(self.tables[kind]) - 1
+
+
+def cMetaPoolStrings(stringsList, kind, conf):
+    '''Replace the string literals of a C strings list with references into the string pool.'''
+    offsets = dict()
+    for strings in stringsList:
+        if strings[1].startswith("\""):
+            offsets[strings[0]] = conf.cMeta.pool.add(strings[1][1:-1])
+            strings[1] = "(" + conf.cMeta.strtab + " + " + str(offsets[strings[0]]) + ")"
+
+    row = list()
+    for key in ("NAME", "DESCRIPTION", "USAGE"):
+        row.append(offsets.get(getPostfix(key, conf.args.shortPostfix), C_META_NONE))
+    index = conf.cMeta.addRow(kind, row)
+    stringsList.append([getPostfix("METAINDEX", conf.args.shortPostfix), str(index), getDesc("METAINDEX", "C")])
+
+
+C_STRING_ESCAPES = {ord("\\"): "\\\\", ord("\""): "\\\"", ord("\n"): "\\n", ord("\r"): "\\r", ord("\t"): "\\t"}
+
+def cMetaStringLiteral(string):
+    '''Escape string for a C string literal. Other control characters become
+    octal escapes, which unlike hex escapes end after three digits.'''
+    if not isinstance(string, bytes):
+        string = string.encode('utf-8')
+    escaped = bytearray()
+    for byte in bytearray(string):
+        if byte in C_STRING_ESCAPES:
+            escaped += C_STRING_ESCAPES[byte]
+        elif byte < 0x20 or byte == 0x7F:
+            escaped += "\\%03o" % byte
+        else:
+            escaped.append(byte)
+    return bytes(escaped).decode('utf-8')
+
+
+def cMetaHeaderPrint():
+    printStr = C_META_TYPES
+    for typeName, _ in SPIRIT_TYPE_NAMES:
+        printStr += "extern const unsigned int ipxact_%s_names[];\n" % typeName
+    return printStr
+
+
+def cMetaFilePrint(cMeta, headerName, blockMetas=()):
+    '''The string pools and metadata tables of cMeta and of the per address
+    block blockMetas of -splitBlocks.'''
+    for _, names in SPIRIT_TYPE_NAMES:
+        for name in names:
+            cMeta.pool.add(name)
+
+    printStr = "#include \"%s\"\n" % headerName
+    printStr += cMetaTablesPrint(cMeta)
+    for typeName, names in SPIRIT_TYPE_NAMES:
+        printStr += "\nconst unsigned int ipxact_%s_names[] = {" % typeName
+        printStr += ", ".join([str(cMeta.pool.offsets[name]) for name in names]) + "};"
+    printStr += "\n"
+    for blockMeta in blockMetas:
+        printStr += cMetaTablesPrint(blockMeta)
+
+    return printStr
+
+def cMetaTablesPrint(cMeta):
+    printStr = "\n" + C_HEADER_DIV + "\n/* String pool */\n"
+    printStr += "const char %s[] =" % cMeta.strtab
+    for string in cMeta.pool.strings:
+        printStr += "\n    \"" + cMetaStringLiteral(string) + "\\0\"\t/* " + str(cMeta.pool.offsets[string]) + " */"
+    if not cMeta.pool.strings:
+        printStr += " \"\""
+    printStr += ";\n"
+
+    for kind in ('ab', 'reg', 'field'):
+        printStr += "\n/* %s metadata: name, description, usage */\n" % kind
+        printStr += "const IPXACT_META_T ipxact_%s_meta%s[] = {" % (kind, cMeta.suffix)
+        rows = ["\n    {" + ", ".join(["0x%X" % offset for offset in row]) + "}" for row in cMeta.tables[kind]]
+        if not rows:
+            rows = ["\n    {IPXACT_META_NONE, IPXACT_META_NONE, IPXACT_META_NONE}"]
+        printStr += ",".join(rows) + "\n};\n"
+    return printStr
+
+
+def cLookupHash(seed, name):
+    '''FNV-1 hash of the utf-8 bytes of name, starting from seed instead of
+    the offset basis if it is not 0. The C twin is ipxact_lookup_hash in
+    C_LOOKUP_FUNCTIONS.'''
+    value = seed or C_LOOKUP_OFFSET_BASIS
+    for byte in bytearray(name.encode('utf-8')):
+        value = ((value * C_LOOKUP_PRIME) & 0xFFFFFFFF) ^ byte
+    return value
+
+
+def getLookupEntries(model):
+    '''(name, kind, parent, width, value) of the registers, fields and
+    enumerated values of a model, named BLOCK.REG, BLOCK.REG.FIELD and
+    BLOCK.REG.FIELD.ENUM. Fields follow their register and enumerated values
+    their field, parent is the index of the register or field.'''
+    entries = list()
+    for addressBlock in model['addressBlocks']:
+        for register in addressBlock['registers']:
+            registerName = "%s.%s" % (addressBlock['name'], register['name'])
+            registerId = len(entries)
+            entries.append((registerName, 0, C_META_NONE, register['size'] or addressBlock['width'] or 0, register['address'] or 0))
+            for field in register['fields']:
+                fieldName = "%s.%s" % (registerName, field['name'])
+                fieldId = len(entries)
+                entries.append((fieldName, 1, registerId, field['bitWidth'] or 0, field['bitOffset'] or 0))
+                for enumeratedValue in field['enumeratedValues']:
+                    entries.append(("%s.%s" % (fieldName, enumeratedValue['name']), 2, fieldId, 0, enumeratedValue['value']))
+    return entries
+
+
+def getPerfectHash(names):
+    '''Minimal perfect hash of names by hash and displace. Names go into
+    buckets by cLookupHash(0, name) and the buckets, largest first, search
+    the seed that puts all their names into free slots by cLookupHash(seed,
+    name). Single name buckets take a free slot directly, stored as
+    -slot - 1. Returns the displacement and slot tables, a slot holds the
+    index of its name in names.'''
+    size = len(names)
+    buckets = [list() for _ in range(size)]
+    for index, name in enumerate(names):
+        buckets[cLookupHash(0, name) % size].append(index)
+    displacements = [0] * size
+    slots = [None] * size
+    for bucket in sorted(buckets, key=len, reverse=True):
+        if len(bucket) <= 1:
+            break
+        seed = 1
+        while True:
+            placed = set()
+            for index in bucket:
+                slot = cLookupHash(seed, names[index]) % size
+                if slots[slot] is not None or slot in placed:
+                    break
+                placed.add(slot)
+            else:
+                break
+            seed += 1
+            if seed >= 1 << 31:
+                raise CLIError("No perfect hash found for the names %s" % ", ".join([names[index] for index in bucket]))
+        for index in bucket:
+            slots[cLookupHash(seed, names[index]) % size] = index
+        displacements[cLookupHash(0, names[bucket[0]]) % size] = seed
+    free = [slot for slot in range(size) if slots[slot] is None]
+    for bucket in buckets:
+        if len(bucket) == 1:
+            slot = free.pop()
+            slots[slot] = bucket[0]
+            displacements[cLookupHash(0, names[bucket[0]]) % size] = -slot - 1
+    return displacements, slots
+
+
+def cLookupFilePrint(model, headerName):
+    '''C file with the name lookup tables of a model and the functions
+    declared in C_LOOKUP_TYPES. The hash is checked here for every name, the
+    generated ipxact_lookup_selftest() checks it again on the target.'''
+    entries = getLookupEntries(model)
+    names = [entry[0] for entry in entries]
+    if len(set(names)) != len(names):
+        duplicates = sorted(set([name for name in names if names.count(name) > 1]))
+        raise CLIError("Duplicate names in lookup table: %s" % ", ".join(duplicates))
+    displacements, slots = getPerfectHash(names)
+    for index, name in enumerate(names):
+        displacement = displacements[cLookupHash(0, name) % len(names)]
+        slot = -displacement - 1 if displacement < 0 else cLookupHash(displacement, name) % len(names)
+        if slots[slot] != index:
+            raise CLIError("Lookup hash does not resolve %s" % name)
+
+    printStr = "#include \"%s\"\n#include <string.h>\n" % headerName
+    printStr += "\n" + C_HEADER_DIV + "\n/* Lookup table: name, kind, parent, width, value */\n"
+    printStr += "const IPXACT_LOOKUP_T ipxact_lookup[] = {"
+    rows = ["\n    {\"%s\", %s, %s, %d, UINT64_C(0x%X)}" % (cMetaStringLiteral(name), C_LOOKUP_KINDS[kind], "IPXACT_LOOKUP_NONE" if parent == C_META_NONE else parent, width, value)
+            for name, kind, parent, width, value in entries]
+    if not rows:
+        rows = ["\n    {\"\", IPXACT_LOOKUP_REGISTER, IPXACT_LOOKUP_NONE, 0, 0}"]
+    printStr += ",".join(rows) + "\n};\n"
+    printStr += "\nconst uint32_t ipxact_lookup_count = %d;\n" % len(entries)
+    printStr += "\n/* Perfect hash of the names, see ipxact_lookup_id_n() */\n"
+    printStr += "static const int32_t ipxact_lookup_displacements[] = {%s};\n" % ", ".join([str(displacement) for displacement in displacements] or ["0"])
+    printStr += "static const uint32_t ipxact_lookup_slots[] = {%s};\n" % ", ".join([str(slot) for slot in slots] or ["0"])
+    printStr += C_LOOKUP_FUNCTIONS
+
+    return printStr
+
     
 
 
-def vhdlFilePrint(root, conf):
-    vhdlConf = copy.deepcopy(conf)
-    vhdlConf.args.c = None
-    printStr = ''
-    printStr += VHDL_HEADER
-    printStr += VHDL_SPIRIT_TYPES
-    printStr += abPrint(root, vhdlConf)
-    printStr += regPrint(root, vhdlConf)
-    printStr += fieldsPrint(root, vhdlConf)
-    printStr += enumsPrint(root, vhdlConf)
-    printStr += VHDL_FOOTER
-        
+EMITTERS = dict()
+
+def registerEmitter(name, emitterClass):
+    '''Register an Emitter subclass so it can be selected with -emit name.'''
+    emitterClass.name = name
+    EMITTERS[name] = emitterClass
+    return emitterClass
+
+def loadEmitterPlugin(path):
+    '''Load a python file that registers additional emitters with registerEmitter.'''
+    path = os.path.normpath(path)
+    if not os.path.exists(os.path.abspath(path)):
+        raise IOError(2, "Plugin does not exist, file:%s" % os.path.abspath(path))
+    log.info("Loading emitter plugin: %s", path)
+    moduleName = "ipxact_plugin_" + os.path.splitext(os.path.basename(path))[0]
+    return imp.load_source(moduleName, path)
+
+
+class Emitter():
+    '''Base class of the output formats. walkComponent calls the element
+    methods of all requested emitters during a single traversal of the
+    component, end() returns the list of (path, contents) to write.
+    Output paths come from -emitpath, else from the argument pathDest names.'''
+    name = None
+    extension = None
+    fileName = None
+    pathDest = None
+
+    def __init__(self, conf):
+        self.conf = conf
+        self.compName = None
+
+    def begin(self, root, compName):
+        self.compName = compName
+
+    def addressBlock(self, addressBlockElement):
+        pass
+
+    def register(self, registerElement, number):
+        pass
+
+    def field(self, fieldElement):
+        pass
+
+    def enumeratedValues(self, enumElement):
+        pass
+
+    def end(self):
+        return list()
+
+    def getOutputPath(self):
+        emitPaths = dict(emitPath.split("=", 1) for emitPath in (getattr(self.conf.args, 'emitPaths', None) or []))
+        if self.name in emitPaths:
+            return normOutputPath(emitPaths[self.name])
+        if self.pathDest is not None:
+            return getattr(self.conf.args, self.pathDest)
+        return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "out", self.fileName or "ipxact." + self.extension)
+
+
+def walkComponent(root, emitters):
+    '''Traverse the component once, feeding every element to all emitters.'''
+    compName = getComponentName(root)
+    registerNumbers = getRegisterNumbers(root)
+
+    for emitter in emitters:
+        emitter.begin(root, compName)
+
+    for addressBlockElement in getAddressBlockElementList(root):
+        for emitter in emitters:
+            emitter.addressBlock(addressBlockElement)
+        for registerElement in addressBlockElement.findall(IPXACT_NS + "register"):
+            number = registerNumbers.get(registerElement)
+            for emitter in emitters:
+                emitter.register(registerElement, number)
+            for fieldElement in registerElement.findall(IPXACT_NS + "field"):
+                for emitter in emitters:
+                    emitter.field(fieldElement)
+                for enumElement in fieldElement.findall(IPXACT_NS + "enumeratedValues"):
+                    for emitter in emitters:
+                        emitter.enumeratedValues(enumElement)
+
+
+class SectionEmitter(Emitter):
+    '''Emitter collecting the address block, register, field and enum
+    constants in separate sections per address block, as used by the C and
+    VHDL output.'''
+    def __init__(self, conf):
+        Emitter.__init__(self, conf)
+        self.blocks = OrderedDict()
+        self.sections = None
+
+    def addressBlock(self, addressBlockElement):
+        abName = ifNotNoneReturnText(addressBlockElement.find(IPXACT_NS + 'name'))
+        self.sections = self.blocks.setdefault(abName, ([], [], [], []))
+        self.sections[0].append(abElementPrint(addressBlockElement, self.compName, self.conf))
+
+    def register(self, registerElement, number):
+        self.sections[1].append(regElementPrint(registerElement, self.compName, self.conf, number))
+
+    def field(self, fieldElement):
+        self.sections[2].append(fieldElementPrint(fieldElement, self.compName, self.conf))
+
+    def enumeratedValues(self, enumElement):
+        self.sections[3].append(enumElementPrint(enumElement, self.conf))
+
+    def sectionsPrint(self, abNames=None):
+        if abNames is None:
+            abNames = list(self.blocks)
+        printStrs = list()
+        for section in range(4):
+            for abName in abNames:
+                printStrs.extend(self.blocks[abName][section])
+        return "".join(printStrs)
+
+    def getBlockOutputPath(self, path, abName):
+        if path == STDIO_PATH:
+            return path
+        base, compression = splitCompressionSuffix(path)
+        base, extension = os.path.splitext(base)
+        return base + "_" + abName + extension + compression
+
+
+class VhdlEmitter(SectionEmitter):
+    extension = "vhd"
+    pathDest = "outvhdl"
+
+    def __init__(self, conf):
+        SectionEmitter.__init__(self, copy.deepcopy(conf))
+        self.conf.args.vhdl = True
+        self.conf.args.c = None
+
+    def packagePrint(self):
+        return VHDL_HEADER + VHDL_SPIRIT_TYPES + self.sectionsPrint() + VHDL_FOOTER
+
+    def blockPackagePrint(self, abName):
+        return VHDL_BLOCK_HEADER % abName.lower() + self.sectionsPrint([abName]) + VHDL_FOOTER
+
+    def end(self):
+        outvhdl = self.getOutputPath()
+        if not self.conf.args.splitBlocks:
+            return [(outvhdl, self.packagePrint())]
+        # package regs only holds the SPIRIT types, the constants of each
+        # address block go to their own package regs_<block>.
+        outputs = [(outvhdl, VHDL_HEADER + VHDL_SPIRIT_TYPES + VHDL_FOOTER)]
+        for abName in self.blocks:
+            outputs.append((self.getBlockOutputPath(outvhdl, abName), self.blockPackagePrint(abName)))
+        return outputs
+
+
+class CEmitter(SectionEmitter):
+    extension = "h"
+    pathDest = "outc"
+
+    def __init__(self, conf, cMeta=None):
+        SectionEmitter.__init__(self, copy.deepcopy(conf))
+        self.conf.args.c = True
+        self.conf.args.vhdl = None
+        if cMeta is None and self.conf.args.cMeta:
+            cMeta = CMetadata()
+        self.conf.cMeta = cMeta
+        self.cMeta = cMeta
+        # With -splitBlocks each address block pools its own strings, so the
+        # offsets and indices in its header only change with the block.
+        self.blockMetas = OrderedDict()
+        self.root = None
+
+    def begin(self, root, compName):
+        SectionEmitter.begin(self, root, compName)
+        self.root = root
+
+    def addressBlock(self, addressBlockElement):
+        if self.cMeta is not None and self.conf.args.splitBlocks:
+            abName = ifNotNoneReturnText(addressBlockElement.find(IPXACT_NS + 'name'))
+            self.conf.cMeta = self.blockMetas.setdefault(abName, CMetadata("_" + abName.lower()))
+        SectionEmitter.addressBlock(self, addressBlockElement)
+
+    def typesPrint(self):
+        printStr = C_SPIRIT_TYPES
+        if self.conf.cMeta is not None:
+            printStr += cMetaHeaderPrint()
+        if self.conf.args.cLookup:
+            printStr += C_LOOKUP_TYPES
+        return printStr
+
+    def headerPrint(self):
+        return C_PRAGMA_ONCE + self.typesPrint() + self.sectionsPrint()
+
+    def end(self):
+        outc = self.getOutputPath()
+        if not self.conf.args.splitBlocks:
+            outputs = [(outc, self.headerPrint())]
+        else:
+            # The umbrella header includes the types header and all address
+            # block headers, each of which only depends on the types header.
+            typesPath = self.getBlockOutputPath(outc, "types")
+            outputs = [(typesPath, C_PRAGMA_ONCE + self.typesPrint())]
+            typesName = os.path.basename(splitCompressionSuffix(typesPath)[0])
+            umbrellaStr = C_PRAGMA_ONCE + "#include \"%s\"\n" % typesName
+            for abName in self.blocks:
+                blockPath = self.getBlockOutputPath(outc, abName)
+                blockStr = C_PRAGMA_ONCE + "#include \"%s\"\n" % typesName
+                if abName in self.blockMetas:
+                    blockStr += self.blockMetas[abName].declarationsPrint()
+                blockStr += self.sectionsPrint([abName]) + "\n"
+                outputs.append((blockPath, blockStr))
+                umbrellaStr += "#include \"%s\"\n" % os.path.basename(splitCompressionSuffix(blockPath)[0])
+            outputs.append((outc, umbrellaStr))
+        if self.cMeta is not None:
+            outputs.append((self.conf.args.outcmeta, cMetaFilePrint(self.cMeta, os.path.basename(splitCompressionSuffix(outc)[0]), self.blockMetas.values())))
+        if self.conf.args.cLookup:
+            outputs.append((self.conf.args.outclookup, cLookupFilePrint(getComponentModel(self.root), os.path.basename(splitCompressionSuffix(outc)[0]))))
+        return outputs
+
+
+def getModelInteger(element, xmlkey):
+    return getScaledNonNegativeInteger(ifNotNoneReturnText(element.find(IPXACT_NS + xmlkey)))
+
+def getModelBool(element, xmlkey):
+    text = ifNotNoneReturnText(element.find(IPXACT_NS + xmlkey))
+    if text is None:
+        return None
+    return text.strip().lower() == "true"
+
+def getModelText(element, xmlkey):
+    return ifNotNoneReturnText(element.find(IPXACT_NS + xmlkey))
+
+
+class ModelEmitter(Emitter):
+    '''Builds a normalized model of the component out of plain ordered
+    dicts and lists, with all numbers converted to integers.'''
+    def begin(self, root, compName):
+        Emitter.begin(self, root, compName)
+        self.model = OrderedDict([('name', compName), ('addressBlocks', list())])
+
+    def addressBlock(self, addressBlockElement):
+        self.addressBlockModel = OrderedDict([
+            ('name', getModelText(addressBlockElement, 'name')),
+            ('description', getModelText(addressBlockElement, 'description')),
+            ('baseAddress', getModelInteger(addressBlockElement, 'baseAddress')),
+            ('range', getModelInteger(addressBlockElement, 'range')),
+            ('width', getModelInteger(addressBlockElement, 'width')),
+            ('usage', getModelText(addressBlockElement, 'usage')),
+            ('access', getModelText(addressBlockElement, 'access')),
+            ('volatile', getModelBool(addressBlockElement, 'volatile')),
+            ('registers', list())])
+        self.model['addressBlocks'].append(self.addressBlockModel)
+
+    def register(self, registerElement, number):
+        addressOffset = getModelInteger(registerElement, 'addressOffset')
+        address = None
+        if addressOffset is not None and self.addressBlockModel['baseAddress'] is not None:
+            address = self.addressBlockModel['baseAddress'] + addressOffset
+        self.registerModel = OrderedDict([
+            ('name', getModelText(registerElement, 'name')),
+            ('description', getModelText(registerElement, 'description')),
+            ('number', number),
+            ('dim', getModelInteger(registerElement, 'dim')),
+            ('addressOffset', addressOffset),
+            ('address', address),
+            ('size', getModelInteger(registerElement, 'size')),
+            ('access', getModelText(registerElement, 'access')),
+            ('volatile', getModelBool(registerElement, 'volatile')),
+            ('resetValue', getModelInteger(registerElement, 'reset/' + IPXACT_NS + 'value')),
+            ('resetMask', getModelInteger(registerElement, 'reset/' + IPXACT_NS + 'mask')),
+            ('fields', list())])
+        self.addressBlockModel['registers'].append(self.registerModel)
+
+    def field(self, fieldElement):
+        testableElement = fieldElement.find(IPXACT_NS + 'testable')
+        testConstraint = None
+        if testableElement is not None:
+            testConstraint = testableElement.get(IPXACT_NS + 'testConstraint')
+        self.fieldModel = OrderedDict([
+            ('name', getModelText(fieldElement, 'name')),
+            ('description', getModelText(fieldElement, 'description')),
+            ('bitOffset', getModelInteger(fieldElement, 'bitOffset')),
+            ('bitWidth', getModelInteger(fieldElement, 'bitWidth')),
+            ('access', getModelText(fieldElement, 'access')),
+            ('volatile', getModelBool(fieldElement, 'volatile')),
+            ('modifiedWriteValue', getModelText(fieldElement, 'modifiedWriteValue')),
+            ('readAction', getModelText(fieldElement, 'readAction')),
+            ('testable', getModelBool(fieldElement, 'testable')),
+            ('testConstraint', testConstraint),
+            ('enumeratedValues', list())])
+        self.registerModel['fields'].append(self.fieldModel)
+
+    def enumeratedValues(self, enumElement):
+        for enumeratedValue in enumElement.findall(IPXACT_NS + 'enumeratedValue'):
+            name = getModelText(enumeratedValue, 'name')
+            value = getModelInteger(enumeratedValue, 'value')
+            if name is not None and value is not None:
+                self.fieldModel['enumeratedValues'].append(OrderedDict([('name', name), ('value', value)]))
+
+    def end(self):
+        return list()
+
+
+class JsonEmitter(ModelEmitter):
+    extension = "json"
+
+    def end(self):
+        return [(self.getOutputPath(), json.dumps(self.model, indent=2, separators=(",", ": ")) + "\n")]
+
+
+# Widest register the struct formats of PY_REGS_MODULE can access
+PY_REGS_MAX_SIZE = 64
+
+class PythonEmitter(ModelEmitter):
+    '''Python register access module on top of mmap, see PY_REGS_MODULE.'''
+    extension = "py"
+    fileName = "ipxact_regs.py"
+
+    def modulePrint(self):
+        blocks = OrderedDict()
+        registers = OrderedDict()
+        span = 0
+        for addressBlock in self.model['addressBlocks']:
+            if addressBlock['baseAddress'] is None:
+                continue
+            blocks[addressBlock['name']] = (addressBlock['baseAddress'], addressBlock['range'] or 0)
+            span = max(span, addressBlock['baseAddress'] + (addressBlock['range'] or 0))
+            for register in addressBlock['registers']:
+                if register['address'] is None:
+                    continue
+                name = addressBlock['name'] + "." + register['name']
+                size = register['size'] or addressBlock['width'] or 32
+                if size > PY_REGS_MAX_SIZE:
+                    log.warning("Register %s of %d bits skipped, the python module supports up to %d bits" % (name, size, PY_REGS_MAX_SIZE))
+                    continue
+                fields = OrderedDict()
+                for field in register['fields']:
+                    if field['bitOffset'] is None or field['bitWidth'] is None:
+                        continue
+                    fields[field['name']] = (field['bitOffset'], ((1 << field['bitWidth']) - 1) << field['bitOffset'])
+                dim = register['dim'] or 1
+                # Register arrays get an entry per element, NAME[i]
+                for index in range(dim):
+                    address = register['address'] + index * ((size + 7) // 8)
+                    registers[name + ("[%d]" % index if dim > 1 else "")] = (address, size, fields)
+                span = max(span, register['address'] + dim * ((size + 7) // 8))
+
+        printStr = "# Generated by ipxact from component %s, do not edit.\n" % self.compName
+        printStr += "\nimport mmap\nimport os\nimport struct\nimport sys\n"
+        printStr += "\nCOMPONENT = %r\n" % self.compName
+        printStr += "\nSPAN = 0x%X\n" % span
+        printStr += "\n# name: (offset, range)\nBLOCKS = {"
+        for name, (address, range_) in blocks.items():
+            printStr += "\n    %r: (0x%X, 0x%X)," % (name, address, range_)
+        printStr += "\n}\n"
+        printStr += "\n# name: (offset, size, {field: (shift, mask)})\nREGISTERS = {"
+        for name, (address, size, fields) in registers.items():
+            printStr += "\n    %r: (0x%X, %d, {" % (name, address, size)
+            printStr += ", ".join(["%r: (%d, 0x%X)" % (field, shift, mask) for field, (shift, mask) in fields.items()])
+            printStr += "}),"
+        printStr += "\n}\n"
+        return printStr + PY_REGS_MODULE
+
+    def end(self):
+        return [(self.getOutputPath(), self.modulePrint())]
+
+
+MEM_FORMATS = OrderedDict([(".bin", "bin"), (".hex", "ihex"), (".ihex", "ihex"), (".mem", "readmemh")])
+
+IHEX_RECORD_SIZE = 16
+
+def getResetRegisters(model):
+    '''Reset values of the registers of a component model, returns the start
+    and end addresses of the address blocks and registers and a dict of
+    register size in bytes -> (addresses, values, masks). Register arrays of
+    dim registers get dim entries.'''
+    bySize = dict()
+    starts, ends = list(), list()
+    for addressBlock in model['addressBlocks']:
+        if addressBlock['baseAddress'] is None:
+            continue
+        starts.append(addressBlock['baseAddress'])
+        ends.append(addressBlock['baseAddress'] + (addressBlock['range'] or 0))
+        for register in addressBlock['registers']:
+            if register['address'] is None:
+                continue
+            size = ((register['size'] or addressBlock['width'] or 32) + 7) // 8
+            ends.append(register['address'] + size * (register['dim'] or 1))
+            if register['resetValue'] is None:
+                continue
+            mask = (1 << (8 * size)) - 1
+            if register['resetMask'] is not None:
+                mask &= register['resetMask']
+            addresses, values, masks = bySize.setdefault(size, (list(), list(), list()))
+            for index in range(register['dim'] or 1):
+                addresses.append(register['address'] + index * size)
+                values.append(register['resetValue'] & mask)
+                masks.append(mask)
+    return starts, ends, bySize
+
+def fillResetImage(data, defined, bySize, getIndices, bigEndian=False):
+    '''Scatter the reset values of bySize into data and defined, getIndices
+    maps an array of register addresses to their first byte index. Registers
+    of up to 64 bits are placed with vectorized byte scatters, one per byte
+    position and register size.'''
+    for size, (addresses, values, masks) in bySize.items():
+        indices = getIndices(np.array(addresses, dtype=np.uint64))
+        if size > 8:
+            for index, value, mask in zip(indices.tolist(), values, masks):
+                for position in range(size):
+                    byteIndex = index + (size - 1 - position if bigEndian else position)
+                    data[byteIndex] = (value >> (8 * position)) & 0xFF
+                    defined[byteIndex] = bool((mask >> (8 * position)) & 0xFF)
+            continue
+        values = np.array(values, dtype=np.uint64)
+        masks = np.array(masks, dtype=np.uint64)
+        for position in range(size):
+            byteIndices = indices + (size - 1 - position if bigEndian else position)
+            shift = np.uint64(8 * position)
+            data[byteIndices] = ((values >> shift) & np.uint64(0xFF)).astype(np.uint8)
+            defined[byteIndices] = ((masks >> shift) & np.uint64(0xFF)) != 0
+
+def getImageBase(starts, bySize, alignment, base):
+    '''Image base, the aligned start of the lowest address block by default.'''
+    if base is None:
+        base = min(starts) // alignment * alignment
+    if any(min(addresses) < base for addresses, _, _ in bySize.values()):
+        raise CLIError("Register reset values below the image base 0x%x" % base)
+    return base
+
+def getResetImage(model, bigEndian=False, alignment=1, base=None):
+    '''Byte image of the register reset values of a component model, laid
+    out by absolute address from base, the lowest address block by default,
+    to the end of the highest address block. Returns (base, data, defined),
+    data is a uint8 array and defined a bool array marking the bytes with
+    bits in the reset mask. Bits outside the reset mask are 0.'''
+    requireNumpy()
+    starts, ends, bySize = getResetRegisters(model)
+    if not starts:
+        return 0, np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.bool_)
+    base = getImageBase(starts, bySize, alignment, base)
+    end = base + (max(ends) - base + alignment - 1) // alignment * alignment
+    data = np.zeros(max(end - base, 0), dtype=np.uint8)
+    defined = np.zeros(len(data), dtype=np.bool_)
+    fillResetImage(data, defined, bySize, lambda addresses: (addresses - np.uint64(base)).astype(np.int64), bigEndian)
+    return base, data, defined
+
+def getSparseResetImage(model, bigEndian=False, alignment=1, base=None):
+    '''Like getResetImage, but only covering the registers with reset
+    values, so the image size does not depend on the distance between the
+    address blocks. Returns (base, segments) with a (start, data, defined)
+    segment per run of alignment sized words holding registers.'''
+    requireNumpy()
+    starts, _, bySize = getResetRegisters(model)
+    if not bySize:
+        return base or 0, list()
+    base = getImageBase(starts, bySize, alignment, base)
+    firsts = np.concatenate([np.array(addresses, dtype=np.uint64) for addresses, _, _ in bySize.values()])
+    lasts = np.concatenate([np.array(addresses, dtype=np.uint64) + np.uint64(size - 1) for size, (addresses, _, _) in bySize.items()])
+    # Word aligned register ranges relative to base, merged into segments
+    step = np.uint64(alignment)
+    firsts = (firsts - np.uint64(base)) // step * step
+    lasts = (lasts - np.uint64(base)) // step * step + step - np.uint64(1)
+    segmentStarts, segmentLasts = mergeIntervals(firsts, lasts)
+    sizes = (segmentLasts - segmentStarts + np.uint64(1)).astype(np.int64)
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+    data = np.zeros(int(sizes.sum()), dtype=np.uint8)
+    defined = np.zeros(len(data), dtype=np.bool_)
+
+    def getIndices(addresses):
+        addresses = addresses - np.uint64(base)
+        segment = np.searchsorted(segmentStarts, addresses, side='right') - 1
+        return (addresses - segmentStarts[segment]).astype(np.int64) + offsets[segment]
+
+    fillResetImage(data, defined, bySize, getIndices, bigEndian)
+    segments = list()
+    for start, offset, size in zip(segmentStarts.tolist(), offsets.tolist(), sizes.tolist()):
+        segments.append((base + start, data[offset:offset + size], defined[offset:offset + size]))
+    return base, segments
+
+def getHexWords(data, wordBytes, bigEndian=False):
+    '''Hexadecimal strings of the words of data, most significant digit first.'''
+    words = data.reshape(-1, wordBytes)
+    if not bigEndian:
+        words = words[:, ::-1]
+    digits = binascii.hexlify(np.ascontiguousarray(words).tobytes()).upper()
+    return [digits[offset:offset + 2 * wordBytes] for offset in range(0, len(digits), 2 * wordBytes)]
+
+def readmemhPrint(compName, base, segments, wordBytes, bigEndian=False, sparse=False):
+    '''$readmemh image with one word per line of the (start, data, defined)
+    segments. Addresses are word indices from base, sparse images only hold
+    the words with defined bytes.'''
+    printStr = "// Generated by ipxact from component %s, do not edit.\n" % compName
+    printStr += "// Reset values from 0x%X, %d bit %s endian words\n" % (base, 8 * wordBytes, "big" if bigEndian else "little")
+    lines = list()
+    previous = -2
+    for start, data, defined in segments:
+        words = getHexWords(data, wordBytes, bigEndian)
+        if not sparse:
+            lines += [word + "\n" for word in words]
+            continue
+        first = (start - base) // wordBytes
+        for index in np.flatnonzero(defined.reshape(-1, wordBytes).any(axis=1)).tolist():
+            if first + index != previous + 1:
+                lines.append("@%X\n" % (first + index))
+            lines.append(words[index] + "\n")
+            previous = first + index
+    return printStr + "".join(lines)
+
+def ihexRecordPrint(recordType, address, payload):
+    record = bytearray([len(payload), (address >> 8) & 0xFF, address & 0xFF, recordType]) + bytearray(payload)
+    return ":%s%02X\n" % (binascii.hexlify(bytes(record)).upper(), -sum(record) & 0xFF)
+
+def ihexPrint(segments, sparse=False):
+    '''Intel HEX image of the (start, data, defined) segments with absolute
+    addresses in records of IHEX_RECORD_SIZE bytes, sparse images only hold
+    the records with defined bytes.'''
+    lines = list()
+    upper = 0
+    for start, data, defined in segments:
+        if len(data) and start + len(data) > 1 << 32:
+            raise CLIError("Intel HEX images are limited to 32 bit addresses, image ends at 0x%x" % (start + len(data)))
+        upper = ihexSegmentPrint(lines, upper, start, data, defined, sparse)
+    lines.append(ihexRecordPrint(1, 0, b""))
+    return "".join(lines)
+
+def ihexSegmentPrint(lines, upper, base, data, defined, sparse):
+    '''Append the records of a segment to lines, returns the upper address
+    of the last extended linear address record.'''
+    for offset in range(0, len(data), IHEX_RECORD_SIZE):
+        if sparse and not defined[offset:offset + IHEX_RECORD_SIZE].any():
+            continue
+        address = base + offset
+        payload = data[offset:offset + IHEX_RECORD_SIZE].tobytes()
+        if address >> 16 != upper or (address + len(payload) - 1) >> 16 != upper:
+            # Records must not cross a 64k segment, split at the boundary
+            split = min(len(payload), ((address >> 16) + 1 << 16) - address)
+            for partAddress, part in ((address, payload[:split]), (address + split, payload[split:])):
+                if not part:
+                    continue
+                if partAddress >> 16 != upper:
+                    upper = partAddress >> 16
+                    lines.append(ihexRecordPrint(4, 0, struct.pack(">H", upper)))
+                lines.append(ihexRecordPrint(0, partAddress & 0xFFFF, part))
+            continue
+        lines.append(ihexRecordPrint(0, address & 0xFFFF, payload))
+    return upper
+
+
+class MemoryImageEmitter(ModelEmitter):
+    '''Reset value image of the whole component for simulation preload, as
+    raw binary, Intel HEX or $readmemh, see getResetImage.'''
+    extension = "mem"
+
+    def getFormat(self, path):
+        memFormat = getattr(self.conf.args, 'memFormat', None)
+        if memFormat is None:
+            memFormat = MEM_FORMATS.get(os.path.splitext(splitCompressionSuffix(path)[0])[1].lower(), "readmemh")
+        return memFormat
+
+    def end(self):
+        args = self.conf.args
+        path = self.getOutputPath()
+        memFormat = self.getFormat(path)
+        memWidth = getattr(args, 'memWidth', None) or 32
+        if memWidth <= 0 or memWidth % 8:
+            raise CLIError("-memWidth must be a positive multiple of 8, not %d" % memWidth)
+        wordBytes = memWidth // 8
+        bigEndian = getattr(args, 'memEndian', None) == "big"
+        # Binary images are always dense
+        sparse = getattr(args, 'memSparse', False) and memFormat != "bin"
+        if sparse:
+            base, segments = getSparseResetImage(self.model, bigEndian, wordBytes, getattr(args, 'memBase', None))
+        else:
+            base, data, defined = getResetImage(self.model, bigEndian, wordBytes, getattr(args, 'memBase', None))
+            segments = [(base, data, defined)]
+        if memFormat == "bin":
+            printStr = segments[0][1].tobytes()
+        elif memFormat == "ihex":
+            printStr = ihexPrint(segments, sparse)
+        else:
+            printStr = readmemhPrint(self.compName, base, segments, wordBytes, bigEndian, sparse)
+        return [(path, printStr)]
+
+
+registerEmitter("c", CEmitter)
+registerEmitter("vhdl", VhdlEmitter)
+registerEmitter("json", JsonEmitter)
+registerEmitter("python", PythonEmitter)
+registerEmitter("mem", MemoryImageEmitter)
+
+
+def getComponentModel(root):
+    emitter = ModelEmitter(None)
+    walkComponent(root, [emitter])
+    return emitter.model
+
+def findModelRegister(model, name):
+    '''Register of a component model by name, either REG or BLOCK.REG.'''
+    abName, _, regName = name.rpartition(".")
+    for addressBlock in model['addressBlocks']:
+        if abName and addressBlock['name'] != abName:
+            continue
+        for register in addressBlock['registers']:
+            if register['name'] == regName:
+                return register
+    raise KeyError("Register %s not found in component %s" % (name, model['name']))
+
+def requireNumpy(feature="bulk register value decoding and encoding"):
+    if np is None:
+        raise CLIError("numpy is required for %s" % feature)
+
+def getFieldDtype(field):
+    return np.min_scalar_type((1 << field['bitWidth']) - 1)
+
+def getRegisterValuesArray(values):
+    values = np.asarray(values)
+    if values.dtype.kind != 'u':
+        values = values.astype(np.uint64)
+    return values
+
+def decodeRegisterValues(register, values, structured=False):
+    '''Split an array of raw register values into one column per field.
+
+    Returns an ordered dict of field name -> array, or a numpy structured
+    array with one member per field if structured is set.'''
+    requireNumpy()
+    values = getRegisterValuesArray(values)
+    scalar = values.dtype.type
+    columns = OrderedDict()
+    for field in register['fields']:
+        mask = (1 << field['bitWidth']) - 1
+        column = values >> scalar(field['bitOffset']) if field['bitOffset'] else values
+        columns[field['name']] = (column & scalar(mask)).astype(getFieldDtype(field), copy=False)
+
+    if not structured:
+        return columns
+
+    decoded = np.empty(values.shape, dtype=[(str(field['name']), getFieldDtype(field)) for field in register['fields']])
+    for name, column in columns.items():
+        decoded[str(name)] = column
+    return decoded
+
+def encodeRegisterValues(register, fields, dtype=None):
+    '''Pack field values into raw register values, the reverse of
+    decodeRegisterValues. fields is a dict of field name -> array or scalar,
+    or a structured array. Bits not covered by fields are taken from the
+    reset value of the register.'''
+    requireNumpy()
+    if dtype is None:
+        dtype = np.min_scalar_type((1 << (register['size'] or 64)) - 1)
+    if hasattr(fields, 'dtype') and fields.dtype.names is not None:
+        fields = dict((name, fields[name]) for name in fields.dtype.names)
+
+    scalar = np.dtype(dtype).type
+    shape = np.broadcast(*[np.asarray(value) for value in fields.values()]).shape if fields else ()
+    values = np.full(shape, scalar(register['resetValue'] or 0), dtype=dtype)
+    for field in register['fields']:
+        if field['name'] not in fields:
+            continue
+        mask = (1 << field['bitWidth']) - 1
+        column = np.asarray(fields[field['name']]).astype(dtype, copy=False) & scalar(mask)
+        values &= scalar(~(mask << field['bitOffset']) & ((1 << (8 * np.dtype(dtype).itemsize)) - 1))
+        values |= column << scalar(field['bitOffset'])
+    return values
+
+def decodeEnumeratedValues(field, column):
+    '''Map a column of field values to the names of its enumerated values,
+    values without a name map to None.'''
+    requireNumpy()
+    names = np.empty(len(field['enumeratedValues']) + 1, dtype=object)
+    lookup = dict()
+    for index, enumeratedValue in enumerate(field['enumeratedValues']):
+        names[index] = enumeratedValue['name']
+        lookup[enumeratedValue['value']] = index
+    unique, inverse = np.unique(np.asarray(column), return_inverse=True)
+    indices = np.array([lookup.get(int(value), len(names) - 1) for value in unique], dtype=np.intp)
+    return names[indices][inverse].reshape(np.shape(column))
+
+def encodeEnumeratedValues(field, names):
+    '''Map a column of enumerated value names to field values.'''
+    requireNumpy()
+    lookup = dict((enumeratedValue['name'], enumeratedValue['value']) for enumeratedValue in field['enumeratedValues'])
+    unique, inverse = np.unique(np.asarray(names), return_inverse=True)
+    values = np.array([lookup[name] for name in unique], dtype=getFieldDtype(field))
+    return values[inverse].reshape(np.shape(names))
+
+class AddressIndex():
+    '''Sorted index of the register address ranges of a component model,
+    mapping absolute addresses to address block, register and fields. A
+    register array of dim registers covers dim times the register size.'''
+    def __init__(self, model):
+        entries = list()
+        self.blocks = list()
+        for addressBlock in model['addressBlocks']:
+            if addressBlock['baseAddress'] is None:
+                continue
+            self.blocks.append((addressBlock['baseAddress'], addressBlock['baseAddress'] + (addressBlock['range'] or 0), addressBlock))
+            for register in addressBlock['registers']:
+                if register['address'] is None:
+                    continue
+                size = ((register['size'] or addressBlock['width'] or 32) + 7) // 8
+                entries.append((register['address'], register['address'] + size * (register['dim'] or 1), addressBlock, register))
+        entries.sort(key=lambda entry: entry[0])
+        self.blocks.sort(key=lambda block: block[0])
+        self.starts = [entry[0] for entry in entries]
+        self.entries = entries
+        self.blockStarts = [block[0] for block in self.blocks]
+
+    def lookup(self, address):
+        '''Returns (addressBlock, register), either may be None if address is not mapped.'''
+        i = bisect.bisect_right(self.starts, address) - 1
+        if i >= 0 and address < self.entries[i][1]:
+            return self.entries[i][2], self.entries[i][3]
+        i = bisect.bisect_right(self.blockStarts, address) - 1
+        if i >= 0 and address < self.blocks[i][1]:
+            return self.blocks[i][2], None
+        return None, None
+
+
+TRACE_BIN_RECORD = struct.Struct("<QQB")
+
+TRACE_CHUNK_SIZE = 1 << 16
+
+def parseTraceLine(line):
+    '''Parse a text trace line "address data R/W" with hexadecimal address
+    and data, returns None for blank and comment lines.'''
+    tokens = line.replace(",", " ").split()
+    if not tokens or tokens[0].startswith("#"):
+        return None
+    if len(tokens) < 3:
+        raise CLIError("Malformed trace line: %s" % line.strip())
+    isWrite = tokens[2].upper() in ("W", "WR", "WRITE", "1")
+    return int(tokens[0], 16), int(tokens[1], 16), isWrite
+
+def getTraceRecords(traceFile, traceFormat="text"):
+    '''Generator of (address, data, isWrite) records, reading the trace in
+    fixed size chunks. Binary traces are little endian records of 64 bit
+    address, 64 bit data and a byte that is 1 for writes, see TRACE_BIN_RECORD.'''
+    if traceFormat == "bin":
+        recordSize = TRACE_BIN_RECORD.size
+        rest = b""
+        while True:
+            chunk = traceFile.read(recordSize * TRACE_CHUNK_SIZE)
+            if not chunk:
+                break
+            chunk = rest + chunk
+            end = len(chunk) - len(chunk) % recordSize
+            for offset in range(0, end, recordSize):
+                address, data, isWrite = TRACE_BIN_RECORD.unpack_from(chunk, offset)
+                yield address, data, bool(isWrite)
+            rest = chunk[end:]
+        if rest:
+            raise CLIError("Truncated binary trace record at end of trace")
+    else:
+        while True:
+            lines = traceFile.readlines(TRACE_CHUNK_SIZE)
+            if not lines:
+                break
+            for line in lines:
+                record = parseTraceLine(line)
+                if record is not None:
+                    yield record
+
+def getTraceAnnotation(addressBlock, register, address, data):
+    if register is not None:
+        annotation = addressBlock['name'] + "." + register['name']
+        fields = ["%s=0x%X" % (field['name'], (data >> field['bitOffset']) & ((1 << field['bitWidth']) - 1))
+                  for field in register['fields'] if field['bitOffset'] is not None and field['bitWidth'] is not None]
+        if fields:
+            annotation += " " + " ".join(fields)
+        return annotation
+    if addressBlock is not None:
+        return "%s+0x%X" % (addressBlock['name'], address - addressBlock['baseAddress'])
+    return "<unmapped>"
+
+def decodeTrace(model, traceFile, outFile, traceFormat="text", histogram=False):
+    '''Annotate a bus trace with the address blocks, registers and field
+    values of model, or with histogram set count the reads and writes per
+    register. The trace is streamed, memory use does not depend on its size.'''
+    index = AddressIndex(model)
+    counts = OrderedDict()
+    for _, _, addressBlock, register in index.entries:
+        counts[addressBlock['name'] + "." + register['name']] = [0, 0]
+    unmapped = [0, 0]
+
+    for address, data, isWrite in getTraceRecords(traceFile, traceFormat):
+        addressBlock, register = index.lookup(address)
+        if histogram:
+            if register is not None:
+                counts[addressBlock['name'] + "." + register['name']][isWrite] += 1
+            else:
+                unmapped[isWrite] += 1
+        else:
+            outFile.write("0x%08X %s 0x%08X %s\n" % (address, "W" if isWrite else "R", data, getTraceAnnotation(addressBlock, register, address, data)))
+
+    if histogram:
+        columnWidth = max([len(name) for name in counts] + [len("<unmapped>")])
+        outFile.write("{0:<{1}} {2:>12} {3:>12}\n".format("register", columnWidth, "reads", "writes"))
+        for name, (reads, writes) in list(counts.items()) + [("<unmapped>", unmapped)]:
+            outFile.write("{0:<{1}} {2:>12} {3:>12}\n".format(name, columnWidth, reads, writes))
+
+def decodeTraceFile(model, args):
+    traceFormat = args.traceFormat
+    if traceFormat is None:
+        traceFormat = "bin" if os.path.splitext(splitCompressionSuffix(args.decodeTrace)[0])[1].lower() == ".bin" else "text"
+    log.info("Decoding %s trace: %s" % (traceFormat, args.decodeTrace))
+    traceFile = openTraceFile(args.decodeTrace, "rb" if traceFormat == "bin" else "r")
+    try:
+        if args.traceOut in (None, STDIO_PATH):
+            decodeTrace(model, traceFile, sys.stdout, traceFormat, args.traceHistogram)
+        else:
+            with openOutputFile(args.traceOut) as outFile:
+                decodeTrace(model, traceFile, outFile, traceFormat, args.traceHistogram)
+                log.info("Wrote decoded trace to %s" % args.traceOut)
+    finally:
+        if args.decodeTrace != STDIO_PATH:
+            traceFile.close()
+
+def getFieldMask(field):
+    return ((1 << field['bitWidth']) - 1) << field['bitOffset']
+
+def validateRegister(addressBlock, register):
+    '''Check the fields and reset value of a register against its size,
+    returns a list of messages.'''
+    issues = list()
+    size = register['size'] or addressBlock['width']
+    if size is None:
+        return issues
+    registerMask = (1 << size) - 1
+
+    resetValue = register['resetValue']
+    resetMask = register['resetMask']
+    if resetMask is None:
+        resetMask = registerMask
+    if resetValue is not None and resetValue & ~registerMask:
+        issues.append("reset value 0x%X does not fit in %d bits" % (resetValue, size))
+    if resetMask & ~registerMask:
+        issues.append("reset mask 0x%X does not fit in %d bits" % (resetMask, size))
+
+    coverage = 0
+    writeOnly = 0
+    for field in register['fields']:
+        if field['bitOffset'] is None or field['bitWidth'] is None:
+            issues.append("field %s has no bitOffset or bitWidth" % field['name'])
+            continue
+        fieldMask = getFieldMask(field)
+        high = field['bitOffset'] + field['bitWidth'] - 1
+        if fieldMask & ~registerMask:
+            issues.append("field %s bits %d..%d exceed register size %d" % (field['name'], high, field['bitOffset'], size))
+        if coverage & fieldMask:
+            overlapping = [other['name'] for other in register['fields'] if other is not field and other['bitOffset'] is not None
+                           and other['bitWidth'] is not None and getFieldMask(other) & fieldMask & coverage]
+            issues.append("field %s bits %d..%d overlap %s" % (field['name'], high, field['bitOffset'], ", ".join(overlapping)))
+        coverage |= fieldMask
+        if (field['access'] or register['access']) in ("write-only", "writeOnce"):
+            writeOnly |= fieldMask
+
+    if resetValue is not None:
+        resetBits = resetValue & resetMask & registerMask
+        if register['fields'] and resetBits & ~coverage:
+            issues.append("reset value 0x%X sets bits 0x%X outside of all fields" % (resetValue, resetBits & ~coverage))
+        if resetBits & writeOnly:
+            issues.append("reset value 0x%X sets bits 0x%X of write-only fields" % (resetValue, resetBits & writeOnly))
+
+    return issues
+
+def validateModel(model):
+    '''Reset value and field layout checks of all registers of a component
+    model, in one pass. Returns a list of (register name, message).'''
+    issues = list()
+    for addressBlock in model['addressBlocks']:
+        for register in addressBlock['registers']:
+            name = addressBlock['name'] + "." + register['name']
+            for issue in validateRegister(addressBlock, register):
+                issues.append((name, issue))
+    return issues
+
+# kind: (position key, compared attributes, child list key, child kind)
+DIFF_KINDS = {
+    'addressBlock': ('baseAddress', ('range', 'width', 'usage', 'access', 'volatile', 'description'), 'registers', 'register'),
+    'register': ('addressOffset', ('size', 'dim', 'access', 'volatile', 'resetValue', 'resetMask', 'description'), 'fields', 'field'),
+    'field': ('bitOffset', ('bitWidth', 'access', 'volatile', 'modifiedWriteValue', 'readAction', 'testable', 'testConstraint', 'description'), 'enumeratedValues', 'enumeratedValue'),
+    'enumeratedValue': ('value', (), None, None)
+              }
+
+def getDiffRecord(change, kind, path, oldItem, newItem, attributes=None):
+    position = DIFF_KINDS[kind][0]
+    record = OrderedDict([('change', change), ('kind', kind), ('path', path)])
+    if oldItem is not None:
+        record['old' + position[0].upper() + position[1:]] = oldItem[position]
+    if newItem is not None:
+        record['new' + position[0].upper() + position[1:]] = newItem[position]
+    if oldItem is not None and newItem is not None and oldItem['name'] != newItem['name']:
+        record['oldName'] = oldItem['name']
+    if attributes:
+        record['attributes'] = attributes
+    return record
+
+def diffModelItems(kind, parentPath, oldItems, newItems, changes):
+    '''Match the items of two versions by name, the remaining ones by
+    position, and append the differences to changes. Matched items are
+    compared recursively.'''
+    position, attributeKeys, childKey, childKind = DIFF_KINDS[kind]
+    newByName = dict((item['name'], item) for item in newItems)
+    matched = list()
+    removed = list()
+    for oldItem in oldItems:
+        newItem = newByName.pop(oldItem['name'], None)
+        if newItem is not None:
+            matched.append((oldItem, newItem))
+        else:
+            removed.append(oldItem)
+
+    added = [item for item in newItems if item['name'] in newByName]
+    newByPosition = dict()
+    for item in added:
+        if item[position] is not None:
+            newByPosition.setdefault(item[position], item)
+    for oldItem in removed:
+        newItem = newByPosition.pop(oldItem[position], None) if oldItem[position] is not None else None
+        if newItem is not None:
+            matched.append((oldItem, newItem))
+        else:
+            changes.append(getDiffRecord("removed", kind, parentPath + oldItem['name'], oldItem, None))
+    renamed = set(id(newItem) for oldItem, newItem in matched if oldItem['name'] != newItem['name'])
+    for newItem in added:
+        if id(newItem) not in renamed:
+            changes.append(getDiffRecord("added", kind, parentPath + newItem['name'], None, newItem))
+
+    for oldItem, newItem in matched:
+        path = parentPath + newItem['name']
+        attributes = OrderedDict()
+        for key in attributeKeys:
+            if oldItem[key] != newItem[key]:
+                attributes[key] = [oldItem[key], newItem[key]]
+        if oldItem['name'] != newItem['name']:
+            changes.append(getDiffRecord("renamed", kind, path, oldItem, newItem, attributes))
+        elif oldItem[position] != newItem[position]:
+            changes.append(getDiffRecord("moved", kind, path, oldItem, newItem, attributes))
+        elif attributes:
+            changes.append(getDiffRecord("changed", kind, path, oldItem, newItem, attributes))
+        if childKey is not None:
+            diffModelItems(childKind, path + ".", oldItem[childKey], newItem[childKey], changes)
+
+def diffModels(oldModel, newModel):
+    '''Differences between two versions of a component model as a list of
+    records with change (added, removed, renamed, moved or changed), kind,
+    dotted path, old and new position and the changed attributes.'''
+    changes = list()
+    diffModelItems('addressBlock', "", oldModel['addressBlocks'], newModel['addressBlocks'], changes)
+    return changes
+
+def diffRecordPrint(record):
+    printStr = "%s %s %s" % (record['change'], record['kind'], record['path'])
+    if 'oldName' in record:
+        printStr += " (was %s)" % record['oldName']
+    if record['change'] == "moved":
+        position = DIFF_KINDS[record['kind']][0]
+        position = position[0].upper() + position[1:]
+        printStr += " %s -> %s" % tuple([hex(value) if value is not None else value for value in (record['old' + position], record['new' + position])])
+    for key, (old, new) in record.get('attributes', dict()).items():
+        printStr += "\n    %s: %s -> %s" % (key, old, new)
     return printStr
+
+def diffFile(newModel, args):
+    oldRoot = openXMLFileReturnRoot(args.diff)
+    # The old version may not have all the parameters of the new one
+    resolveParameters(oldRoot, args.params, strict=False)
+    oldModel = getComponentModel(oldRoot)
+    changes = diffModels(oldModel, newModel)
+    log.info("Found %d differences to %s" % (len(changes), args.diff))
+    if args.diffFormat == "json":
+        printStr = json.dumps(changes, indent=2, separators=(",", ": ")) + "\n"
+    else:
+        printStr = "".join([diffRecordPrint(record) + "\n" for record in changes])
+    if args.diffOut is None:
+        sys.stdout.write(printStr)
+    else:
+        writeOutputFile(normOutputPath(args.diffOut), printStr)
+        log.info("Wrote differences to %s" % args.diffOut)
+
+ADDRESS_SPACE_SIZE = 1 << 64
+
+def mergeIntervals(starts, lasts):
+    '''Union of the inclusive address ranges [starts[i], lasts[i]], returns
+    the sorted arrays of starts and lasts of the merged ranges. Adjacent
+    ranges are merged. A vectorized sweep over the ranges sorted by start, the
+    running maximum of the lasts closes a range wherever the next start lies
+    beyond it.'''
+    # Registers usually come sorted by address already
+    if np.any(starts[1:] < starts[:-1]):
+        order = np.argsort(starts, kind='mergesort')
+        starts, lasts = starts[order], lasts[order]
+    runLasts = np.maximum.accumulate(lasts)
+    # start > last + 1, written to not overflow at the top of the space
+    newRun = (starts[1:] > runLasts[:-1]) & (starts[1:] - runLasts[:-1] > 1)
+    runStarts = np.concatenate(([0], np.flatnonzero(newRun) + 1)) if len(starts) else np.zeros(0, dtype=np.intp)
+    runEnds = np.concatenate((runStarts[1:] - 1, [len(starts) - 1])) if len(starts) else runStarts
+    return starts[runStarts], runLasts[runEnds]
+
+def getFreeWindows(mergedStarts, mergedLasts, first, last):
+    '''Arrays of the starts and lasts of the inclusive ranges within
+    [first, last] not covered by the merged ranges.'''
+    inside = (mergedLasts >= first) & (mergedStarts <= last)
+    starts = np.maximum(mergedStarts[inside], np.uint64(first))
+    lasts = np.minimum(mergedLasts[inside], np.uint64(last))
+    if not len(starts):
+        return np.array([first], dtype=np.uint64), np.array([last], dtype=np.uint64)
+    # Merged ranges are never adjacent, so there is a window between each two
+    windowStarts, windowLasts = lasts[:-1] + np.uint64(1), starts[1:] - np.uint64(1)
+    if starts[0] > first:
+        windowStarts = np.concatenate(([first], windowStarts)).astype(np.uint64)
+        windowLasts = np.concatenate(([starts[0] - np.uint64(1)], windowLasts)).astype(np.uint64)
+    if lasts[-1] < last:
+        windowStarts = np.concatenate((windowStarts, [lasts[-1] + np.uint64(1)])).astype(np.uint64)
+        windowLasts = np.concatenate((windowLasts, [last])).astype(np.uint64)
+    return windowStarts, windowLasts
+
+def getArraySum(values):
+    '''Exact sum of an uint64 array, whose sum may not fit 64 bits.'''
+    return (int(np.sum(values >> np.uint64(32), dtype=np.uint64)) << 32) + int(np.sum(values & np.uint64(0xFFFFFFFF), dtype=np.uint64))
+
+def getRangesSize(starts, lasts):
+    '''Total bytes of disjoint inclusive ranges.'''
+    return getArraySum(lasts - starts) + len(starts)
+
+def getAlignedSlots(starts, lasts, alignment):
+    '''Array of the number of alignment sized and aligned slots in each
+    [starts[i], lasts[i]].'''
+    alignment = np.uint64(alignment)
+    first = starts // alignment + (starts % alignment != 0)
+    end = lasts // alignment + (lasts % alignment == alignment - np.uint64(1))
+    return np.where(end > first, end - first, np.uint64(0))
+
+def getWindowRecord(start, last, slots):
+    return OrderedDict([('start', start), ('size', last - start + 1), ('alignedSlots', slots)])
+
+def getOccupancyRecord(windowStarts, windowLasts, size, used, alignment, top):
+    '''Occupancy of a range of size bytes with used bytes mapped and the
+    given free windows. Fragmentation is 1 - largest free window / free bytes,
+    0 for a single free window.'''
+    free = size - used
+    windowSizes = windowLasts - windowStarts
+    slots = getAlignedSlots(windowStarts, windowLasts, alignment)
+    largest = int(windowSizes.max()) + 1 if len(windowSizes) else 0
+    # Largest first, then by start. The windows are sorted by start, so a
+    # stable sort of the candidates for the top sizes is enough.
+    candidates = np.arange(len(windowSizes))
+    if len(windowSizes) > top > 0:
+        candidates = np.flatnonzero(windowSizes >= np.partition(windowSizes, len(windowSizes) - top)[len(windowSizes) - top])
+    order = candidates[np.argsort(~windowSizes[candidates], kind='mergesort')][:top]
+    return OrderedDict([
+        ('size', size),
+        ('used', used),
+        ('occupancy', float(used) / size if size else 0.0),
+        ('freeWindows', len(windowStarts)),
+        ('fragmentation', 1.0 - float(largest) / free if free else 0.0),
+        ('alignment', alignment),
+        ('alignedSlots', getArraySum(slots)),
+        ('largestFreeWindows', [getWindowRecord(int(windowStarts[index]), int(windowLasts[index]), int(slots[index])) for index in order]),
+    ])
+
+def getRegisterRanges(addressBlock):
+    '''Arrays of the first and last byte addresses of the registers of an
+    address block, register arrays of dim registers taking dim times the
+    register size.'''
+    registers = [register for register in addressBlock['registers'] if register['address'] is not None]
+    starts = np.fromiter(imap(itemgetter('address'), registers), np.uint64, len(registers))
+    sizes = np.fromiter((((register['size'] or addressBlock['width'] or 32) + 7) // 8 * (register['dim'] or 1) for register in registers), np.uint64, len(registers))
+    starts = starts[sizes > 0]
+    return starts, starts + sizes[sizes > 0] - np.uint64(1)
+
+def getOccupancyReport(model, alignment=0x1000, top=10):
+    '''Occupancy of each address block by its registers, with the free
+    register slots aligned to the block width, and of the 64 bit address
+    space by the address blocks, with the free slots of the given alignment.'''
+    requireNumpy("the occupancy report")
+    blockStarts, blockLasts = list(), list()
+    blocks = list()
+    for addressBlock in model['addressBlocks']:
+        base = addressBlock['baseAddress']
+        if base is None:
+            continue
+        mergedStarts, mergedLasts = mergeIntervals(*getRegisterRanges(addressBlock))
+        blockRange = addressBlock['range'] or max(int(mergedLasts.max()) if len(mergedLasts) else 0, base - 1) + 1 - base
+        record = OrderedDict([('name', addressBlock['name']), ('baseAddress', base)])
+        if blockRange:
+            blockLast = base + blockRange - 1
+            windowStarts, windowLasts = getFreeWindows(mergedStarts, mergedLasts, base, blockLast)
+            used = blockRange - getRangesSize(windowStarts, windowLasts)
+            blockStarts.append(base)
+            blockLasts.append(blockLast)
+        else:
+            windowStarts, windowLasts, used = np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64), 0
+        record.update(getOccupancyRecord(windowStarts, windowLasts, blockRange, used, max((addressBlock['width'] or 32) // 8, 1), top))
+        blocks.append(record)
+
+    mergedStarts, mergedLasts = mergeIntervals(np.array(blockStarts, dtype=np.uint64), np.array(blockLasts, dtype=np.uint64))
+    windowStarts, windowLasts = getFreeWindows(mergedStarts, mergedLasts, 0, ADDRESS_SPACE_SIZE - 1)
+    report = OrderedDict([('name', model['name'])])
+    report.update(getOccupancyRecord(windowStarts, windowLasts, ADDRESS_SPACE_SIZE, getRangesSize(mergedStarts, mergedLasts), alignment, top))
+    report['addressBlocks'] = blocks
+    return report
+
+def occupancyRecordPrint(record):
+    printStr = "0x%x of 0x%x bytes used (%.1f%%), %d free windows, fragmentation %.2f, %d free slots of 0x%x bytes\n" % (
+        record['used'], record['size'], 100 * record['occupancy'], record['freeWindows'], record['fragmentation'], record['alignedSlots'], record['alignment'])
+    for window in record['largestFreeWindows']:
+        printStr += "    free 0x%x-0x%x (0x%x bytes, %d slots)\n" % (window['start'], window['start'] + window['size'] - 1, window['size'], window['alignedSlots'])
+    return printStr
+
+def occupancyReportPrint(report):
+    printStr = "Address space of %s: " % report['name'] + occupancyRecordPrint(report)
+    for block in report['addressBlocks']:
+        printStr += "Address block %s at 0x%x: " % (block['name'], block['baseAddress']) + occupancyRecordPrint(block)
+    return printStr
+
+def occupancyFile(model, args):
+    report = getOccupancyReport(model, args.occupancyAlign, args.occupancyTop)
+    if args.occupancyFormat == "json":
+        printStr = json.dumps(report, indent=2, separators=(",", ": ")) + "\n"
+    else:
+        printStr = occupancyReportPrint(report)
+    if args.occupancyOut is None:
+        sys.stdout.write(printStr)
+    else:
+        writeOutputFile(normOutputPath(args.occupancyOut), printStr)
+        log.info("Wrote occupancy report to %s" % args.occupancyOut)
+
+def needsModel(args):
+    return args.decodeTrace is not None or args.validate or args.diff is not None or args.occupancy
+
+def writesToStdout(args):
+    if (args.decodeTrace is not None and args.traceOut is None) or (args.diff is not None and args.diffOut is None) or (args.occupancy and args.occupancyOut is None):
+        return True
+    paths = [args.outc, args.outvhdl, args.outcmeta, args.outclookup, args.traceOut, args.diffOut, args.occupancyOut]
+    paths += [emitPath.split("=", 1)[-1] for emitPath in (args.emitPaths or [])]
+    return STDIO_PATH in paths
+
+def getEmitterNames(args):
+    names = list()
+    if args.vhdl:
+        names.append("vhdl")
+    if args.c:
+        names.append("c")
+    for emit in (args.emit or []):
+        for name in emit.split(","):
+            name = name.strip()
+            if name and name not in names:
+                names.append(name)
+    return names
+
+def getEmitters(args, conf):
+    emitters = list()
+    for name in getEmitterNames(args):
+        if name not in EMITTERS:
+            raise CLIError("Unknown output format '%s', available: %s" % (name, ",".join(sorted(EMITTERS))))
+        emitters.append(EMITTERS[name](conf))
+    return emitters
+
+def getOverrides(params):
+    '''Dict of the name=value overrides of the -param arguments.'''
+    overrides = OrderedDict()
+    for param in (params or []):
+        name, _, value = param.partition("=")
+        overrides[name.strip()] = value
+    return overrides
+
+def resolveParameters(root, params=None, strict=True):
+    '''Evaluate the parameter expressions of root with the name=value
+    overrides in params and write the values into the tree. Unless strict,
+    overrides of parameters root does not have are skipped with a warning.'''
+    resolver = ParameterResolver(root)
+    for name, value in getOverrides(params).items():
+        if not strict and resolver.aliases.get(name, name) not in resolver.expressions:
+            log.warning("Parameter '%s' not found, override skipped" % name)
+            continue
+        resolver.override(name, value)
+    resolver.resolve()
+    return resolver
+
+def writeOutputFile(path, printStr):
+    '''Write printStr to path unless the file already has this content, so
+    the timestamps of unchanged outputs do not trigger rebuilds. Paths ending
+    in .gz or .xz are compressed, STDIO_PATH writes to stdout. Returns True if
+    the file was written.'''
+    if path == STDIO_PATH:
+        sys.stdout.write(printStr)
+        sys.stdout.flush()
+        return True
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if b"".join(getInputChunks(f)) == printStr:
+                log.info("Unchanged: %s" % path)
+                return False
+    with openOutputFile(path) as f:
+        f.write(printStr)
+    return True
+
+
+def vhdlFilePrint(root, conf):
+    emitter = VhdlEmitter(conf)
+    walkComponent(root, [emitter])
+    return emitter.packagePrint()
     
             
             
-def cFilePrint(root, conf):
-    cConf = copy.deepcopy(conf)
-    cConf.args.vhdl = None
-    printStr = ''
-    printStr += C_PRAGMA_ONCE
-    printStr += C_SPIRIT_TYPES
-    printStr += abPrint(root, cConf)
-    printStr += regPrint(root, cConf)
-    printStr += fieldsPrint(root, cConf)
-    printStr += enumsPrint(root, cConf)
-    
-    return printStr
+def cFilePrint(root, conf, cMeta=None):
+    emitter = CEmitter(conf, cMeta)
+    walkComponent(root, [emitter])
+    return emitter.headerPrint()
+
+
+def getMemoryStatus(key):
+    '''Value in bytes of a kB entry of /proc/self/status, i.e. VmRSS or
+    VmHWM, None where it is not available.'''
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1]) * 1024
+    except IOError:
+        pass
+    return None
+
+def resetPeakRss():
+    '''Reset VmHWM to the current RSS, returns False where the kernel does
+    not support it.'''
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except IOError:
+        return False
 
+def getPeakRss():
+    peak = getMemoryStatus("VmHWM")
+    if peak is None:
+        # ru_maxrss is in kB on Linux
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return peak
+
+def formatBytes(size):
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return "%d %s" % (size, unit) if unit == "B" else "%.1f %s" % (size, unit)
+        size /= 1024.0
+    return "%.1f GiB" % size
+
+
+class MemoryMonitor():
+    '''Peak memory of the phases of a run. Peak RSS is reset at the start of
+    each phase where /proc/self/clear_refs allows it, otherwise the peaks are
+    those of the process so far. Peaks of python allocations come from
+    tracemalloc, so they are only reported with Python 3. With a budget in
+    bytes, a phase exceeding it fails the run, and the address space is
+    limited so larger allocations fail instead of getting the process
+    killed, see isOutOfMemory.'''
+    def __init__(self, report=False, budget=None):
+        self.enabled = report or budget is not None
+        self.report = report
+        self.budget = budget
+        self.phases = list()
+        self.name = None
+        if not self.enabled:
+            return
+        self.resettable = resetPeakRss()
+        if tracemalloc is not None and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if budget is not None:
+            virtual = getMemoryStatus("VmSize")
+            rss = getMemoryStatus("VmRSS")
+            if rss is not None and budget <= rss:
+                raise CLIError("Memory budget of %s is below the %s resident at startup" % (formatBytes(budget), formatBytes(rss)))
+            if virtual is not None and rss is not None:
+                limit = virtual - rss + budget
+                hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+                if hard == resource.RLIM_INFINITY or limit < hard:
+                    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+    def phase(self, name=None, check=True):
+        '''End the current phase and start the phase name, if any. Unless
+        check is False, raises CLIError if the ended phase exceeded the budget.'''
+        if not self.enabled:
+            return
+        if self.name is not None:
+            traced = None
+            if tracemalloc is not None:
+                traced = tracemalloc.get_traced_memory()[1]
+            self.phases.append((self.name, getMemoryStatus("VmRSS"), getPeakRss(), traced))
+            self.name = None
+            if check:
+                self.checkBudget()
+        self.name = name
+        if name is not None:
+            if self.resettable:
+                resetPeakRss()
+            if tracemalloc is not None and hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+
+    def checkBudget(self):
+        '''Raise CLIError if the last ended phase exceeded the budget.'''
+        if self.budget is not None and self.phases and self.phases[-1][2] > self.budget:
+            name, _, peak, _ = self.phases[-1]
+            raise CLIError("Memory budget of %s exceeded during %s, peak RSS %s" % (formatBytes(self.budget), name, formatBytes(peak)))
+
+    def isOutOfMemory(self, e):
+        '''True if e is an allocation failure under the budget, a MemoryError
+        or a libxml2 error, which lxml raises as a syntax error.'''
+        if self.budget is None:
+            return False
+        return isinstance(e, MemoryError) or "memory allocation failed" in str(e).lower()
+
+    def outOfMemory(self):
+        return CLIError("Memory budget of %s exhausted during %s" % (formatBytes(self.budget), self.name))
+
+    def reportPrint(self):
+        columns = [("rss", 1), ("peak rss", 2)] + ([("traced peak", 3)] if tracemalloc is not None else [])
+        printStr = "%-24s" % "phase" + "".join([" %12s" % title for title, _ in columns]) + "\n"
+        for phase in self.phases:
+            printStr += "%-24s" % phase[0] + "".join([" %12s" % formatBytes(phase[index]) for _, index in columns]) + "\n"
+        if not self.resettable:
+            printStr += "peak rss is the peak of the process up to the end of each phase\n"
+        return printStr
+
+
+SERVER_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "ipxact-%d.sock" % os.getuid())
+
+SERVER_CACHE_SIZE = 16
+
+class ComponentCache():
+    '''LRU cache of parsed components by path. An entry is parsed again when
+    the modification time or size of its file changed.'''
+    def __init__(self, capacity=SERVER_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        '''Dict with the parsed tree (source), the tree with resolved
+        parameters (root), its digest, model and AddressIndex. The tree for
+        -param overrides is kept in working, see getParameterRoot.'''
+        path = os.path.abspath(os.path.normpath(path))
+        stat = os.stat(path)
+        key = (stat.st_mtime, stat.st_size)
+        with self.lock:
+            entry = self.entries.pop(path, None)
+            if entry is not None and entry['key'] == key:
+                self.entries[path] = entry
+                self.hits += 1
+                return entry
+            self.misses += 1
+        # Parse outside the lock, so other components are served meanwhile
+        source, digest = parseXMLFile(path)
+        root = copy.deepcopy(source)
+        resolveParameters(root)
+        model = getComponentModel(root)
+        entry = dict(key=key, source=source, root=root, digest=digest, model=model, index=AddressIndex(model),
+                     lock=threading.Lock(), working=None, resolver=None, overrides=None)
+        with self.lock:
+            self.entries[path] = entry
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        return entry
+
+    def getParameterRoot(self, entry, params):
+        '''The tree of entry resolved with the -param overrides in params.
+        Only the elements depending on parameters that changed since the
+        previous overrides are evaluated again. Call with entry['lock'] held.'''
+        overrides = getOverrides(params)
+        try:
+            if entry['working'] is None:
+                entry['working'] = copy.deepcopy(entry['source'])
+                entry['resolver'] = resolveParameters(entry['working'], params)
+            else:
+                entry['resolver'].overrideAndResolve(overrides, entry['overrides'])
+        except Exception:
+            # A failed override leaves the tree half updated, start over next time
+            entry['working'] = None
+            raise
+        entry['overrides'] = overrides
+        return entry['working']
+
+
+class ServerRequestHandler(SocketServer.StreamRequestHandler):
+    '''Answers each line holding a JSON request with a line holding the
+    JSON response, until the client closes the connection.'''
+    def handle(self):
+        for line in iter(self.rfile.readline, b""):
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception, e:
+                log.error("Request failed: %s" % e)
+                response = OrderedDict([('ok', False), ('error', str(e) or e.__class__.__name__)])
+            self.wfile.write(json.dumps(response) + "\n")
+            self.wfile.flush()
+
+
+def getServerOutputPath(cwd, path):
+    if path == STDIO_PATH:
+        return path
+    return normOutputPath(os.path.join(cwd, path))
+
+
+class ComponentServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    '''Generation server on a unix socket, keeping parsed components in a
+    ComponentCache. Each connection is served by its own thread. Requests
+    are dicts with an op of generate (argv, cwd), query (path and address
+    or name), validate (path, schema) or stats. Inputs that passed schema
+    validation are remembered in schemaCache, None disables the cache.'''
+    daemon_threads = True
+
+    def __init__(self, path=SERVER_SOCKET_PATH, capacity=SERVER_CACHE_SIZE, schemaCache=SCHEMA_CACHE_DIR):
+        if os.path.exists(path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(path)
+                raise CLIError("A server is already listening on %s" % path)
+            except socket.error:
+                os.unlink(path)
+            finally:
+                probe.close()
+        SocketServer.UnixStreamServer.__init__(self, path, ServerRequestHandler)
+        self.cache = ComponentCache(capacity)
+        self.schemaCache = schemaCache
+        self.ops = dict(generate=self.generate, query=self.query, validate=self.validate, stats=self.stats)
+
+    def dispatch(self, request):
+        op = request.get('op')
+        if op not in self.ops:
+            raise CLIError("Unknown request '%s', available: %s" % (op, ",".join(sorted(self.ops))))
+        response = OrderedDict([('ok', True)])
+        response.update(self.ops[op](request))
+        return response
+
+    def generate(self, request):
+        '''Run the output formats selected by the command line arguments in
+        argv, relative paths are relative to cwd. Outputs to STDIO_PATH are
+        returned in stdout.'''
+        cwd = request.get('cwd') or os.getcwd()
+        try:
+            args = getArgumentParser().parse_args(request['argv'])
+        except SystemExit:
+            raise CLIError("Invalid arguments: %s" % " ".join(request['argv']))
+        if needsModel(args) or args.schemaValidate:
+            raise CLIError("-validate, -schemaValidate, -diff, -decodeTrace and -occupancy are not served, use a validate request or run ipxact directly")
+        if args.inpath is None or args.inpath == STDIO_PATH:
+            raise CLIError("A server needs the input path of the component")
+        args.inpath = os.path.join(cwd, args.inpath)
+        for dest in ('outc', 'outvhdl', 'outcmeta', 'outclookup'):
+            setattr(args, dest, getServerOutputPath(cwd, getattr(args, dest)))
+        args.emitPaths = ["%s=%s" % (name, getServerOutputPath(cwd, path))
+                          for name, _, path in [emitPath.partition("=") for emitPath in (args.emitPaths or [])]]
+
+        entry = self.cache.get(args.inpath)
+        if args.params:
+            # The working tree is shared by the requests with overrides
+            with entry['lock']:
+                outputs = self.emit(args, self.cache.getParameterRoot(entry, args.params))
+        else:
+            outputs = self.emit(args, entry['root'])
+
+        written, unchanged, stdout = list(), list(), ""
+        for path, printStr in outputs:
+            if path == STDIO_PATH:
+                stdout += printStr
+            elif writeOutputFile(path, printStr):
+                written.append(path)
+            else:
+                unchanged.append(path)
+        return OrderedDict([('written', written), ('unchanged', unchanged), ('stdout', stdout)])
+
+    def emit(self, args, root):
+        emitters = getEmitters(args, Config(args))
+        walkComponent(root, emitters)
+        return [output for emitter in emitters for output in emitter.end()]
+
+    def query(self, request):
+        '''Address block and register at an address, or the register or
+        address block of a name.'''
+        entry = self.cache.get(request['path'])
+        if request.get('address') is not None:
+            address = request['address']
+            if not isinstance(address, (int, long)):
+                address = getScaledNonNegativeInteger(address)
+            addressBlock, register = entry['index'].lookup(address)
+        else:
+            addressBlock, register = None, None
+            for candidate in entry['model']['addressBlocks']:
+                if candidate['name'] == request['name']:
+                    addressBlock = candidate
+            if addressBlock is None:
+                try:
+                    register = findModelRegister(entry['model'], request['name'])
+                except KeyError, e:
+                    raise CLIError(e.args[0])
+        if register is not None and addressBlock is None:
+            addressBlock = [candidate for candidate in entry['model']['addressBlocks'] if register in candidate['registers']][0]
+        if addressBlock is not None and register is None:
+            addressBlock = OrderedDict([(key, value) for key, value in addressBlock.items() if key != 'registers'])
+        return OrderedDict([('addressBlock', addressBlock['name'] if register is not None else addressBlock), ('register', register)])
+
+    def validate(self, request):
+        '''Issues of validateModel and, with schema set, the schema violations.'''
+        entry = self.cache.get(request['path'])
+        issues = list()
+        if request.get('schema'):
+            try:
+                validateSchema(entry['root'], entry['digest'], request['schema'] if request['schema'] is not True else SCHEMA_PATH,
+                               self.schemaCache)
+            except CLIError, e:
+                issues.append(("schema", e.msg))
+        issues += validateModel(entry['model'])
+        return OrderedDict([('issues', issues)])
+
+    def stats(self, request):
+        return OrderedDict([('entries', list(self.cache.entries)), ('capacity', self.cache.capacity), ('hits', self.cache.hits), ('misses', self.cache.misses)])
+
+
+def serve(path=SERVER_SOCKET_PATH, capacity=SERVER_CACHE_SIZE, schemaCache=SCHEMA_CACHE_DIR):
+    server = ComponentServer(path, capacity, schemaCache)
+    log.info("Serving on %s" % path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def getSchemaCacheDir(args):
+    return None if args.schemaCache.lower() == "none" else args.schemaCache
+
+def getArgumentParser(description=None, versionMessage=None):
+    parser = ArgumentParser(description=description, formatter_class=RawDescriptionHelpFormatter)
+    parser.add_argument(dest="inpath", nargs='?', help="path to input IP-XACT source file, may be gzip or xz compressed, '-' reads from stdin")
+    parser.add_argument("-v", "--verbose", dest="verbose", action="count", help="set verbosity level [default: %(default)s]")
+    parser.add_argument('-c', action='store_true', help="enable c header output")
+    parser.add_argument('-vhdl', action='store_true', help="enable vhdl package output")
+    parser.add_argument('-cMeta', action='store_true', help="Move names, descriptions and other textual metadata from the c header into a separate c file with a pooled string table")
+    parser.add_argument('-cLookup', action='store_true', help="generate a c file mapping register, field and enum names like BLOCK.REG.FIELD.ENUM to ids and values through a minimal perfect hash, with a self test")
+    parser.add_argument('-emit', '--emit', dest="emit", action='append', help="comma separated list of output formats generated in a single pass, i.e. c,vhdl,json. Available: %s" % ",".join(sorted(EMITTERS)))
+    parser.add_argument('-plugin', dest="plugins", action='append', metavar='path', help="python file registering additional output formats with ipxact.registerEmitter")
+    parser.add_argument('-emitpath', dest="emitPaths", action='append', metavar='name=path', help="output path for the given output format, i.e. json=out/regs.json. Like all output paths, paths ending in .gz or .xz are compressed and '-' writes to stdout")
+    parser.add_argument('-memFormat', choices=sorted(set(MEM_FORMATS.values())), help="format of the reset value image of the mem output format [default: by the extension of its path, .bin, .hex or readmemh]")
+    parser.add_argument('-memWidth', metavar='bits', default=32, type=int, help="word width of the mem output format [default: %(default)s]")
+    parser.add_argument('-memEndian', choices=["little", "big"], default="little", help="byte order of registers and words in the mem output format [default: %(default)s]")
+    parser.add_argument('-memBase', metavar='address', type=getScaledNonNegativeInteger, help="address of the first byte of the mem output format [default: lowest address block]")
+    parser.add_argument('-memSparse', action='store_true', help="only write the words with reset values to the mem output format, binary images are always dense")
+    parser.add_argument('-schemaValidate', action='store_true', help="validate the input, with its parameters resolved, against the IP-XACT schema before generating output")
+    parser.add_argument('-schema', metavar='path', default=SCHEMA_PATH, help="schema used by -schemaValidate, i.e. a local copy of the SPIRIT 1.5 index.xsd [default: %(default)s]")
+    parser.add_argument('-schemaCache', metavar='dir', default=SCHEMA_CACHE_DIR, help="directory remembering inputs that passed -schemaValidate, 'none' disables the cache [default: %(default)s]")
+    parser.add_argument('-validate', action='store_true', help="check reset values and field layout of all registers, i.e. overlapping fields, fields and reset values exceeding the register size and reset values of write-only and reserved bits")
+    parser.add_argument('-diff', metavar='path', help="report the differences in address blocks, registers, fields and enumerated values of the input to an older version of the component")
+    parser.add_argument('-diffFormat', choices=["text", "json"], default="text", help="format of the -diff report [default: %(default)s]")
+    parser.add_argument('-diffOut', metavar='path', help="output path for the -diff report [default: stdout]")
+    parser.add_argument('-occupancy', action='store_true', help="report how much of each address block is used by registers and how much of the 64 bit address space by address blocks, with the largest free windows and the free aligned slots")
+    parser.add_argument('-occupancyFormat', choices=["text", "json"], default="text", help="format of the -occupancy report [default: %(default)s]")
+    parser.add_argument('-occupancyOut', metavar='path', help="output path for the -occupancy report [default: stdout]")
+    parser.add_argument('-occupancyAlign', metavar='bytes', default=0x1000, type=getScaledPositiveInteger, help="alignment and size of the free slots in the address space, address blocks use their width [default: %(default)s]")
+    parser.add_argument('-occupancyTop', metavar='n', default=10, type=int, help="number of largest free windows listed [default: %(default)s]")
+    parser.add_argument('-decodeTrace', '--decode-trace', dest="decodeTrace", metavar='path', help="annotate a bus trace with address block, register and field names. Text traces have one hexadecimal 'address data R/W' transaction per line, .gz and .xz traces are decompressed")
+    parser.add_argument('-traceFormat', choices=["text", "bin"], help="format of the trace, see -decodeTrace [default: bin for .bin files, text otherwise]")
+    parser.add_argument('-traceOut', metavar='path', help="output path for the decoded trace [default: stdout]")
+    parser.add_argument('-traceHistogram', action='store_true', help="output the number of reads and writes per register instead of the annotated trace")
+    parser.add_argument('-param', dest="params", action='append', metavar='name=value', help="override the value of a parameter, referenced by name or id, with a number or expression")
+    parser.add_argument('-splitBlocks', action='store_true', help="write one c header and one vhdl package per address block, plus an umbrella header and a package regs with the common types. Unchanged files are not rewritten")
+    parser.add_argument('-shortPostfix', action='store_true', help="Abbreviate postfix, i.e _DESCRIPTION -> _DESC")
+    parser.add_argument('-noComponentNameInAb', action='store_true', help="Exclude component name from generated address block names. Warning: This could cause naming conflicts.")
+    parser.add_argument('-noComponentNameInReg', action='store_true', help="Exclude component name from generated register names. Warning: This could cause naming conflicts.")
+    parser.add_argument('-noAddressBlockNameInReg', action='store_true', help="Exclude address block name from generated register names. Warning: This could cause naming conflicts.")
+    parser.add_argument('-noComponentNameInField', action='store_true', help="Exclude component name from generated field names. Warning: This could cause naming conflicts.")
+    parser.add_argument('-noAddressBlockNameInField', action='store_true', help="Exclude address block name from generated field names. Warning: This could cause naming conflicts.")
+    parser.add_argument('-noRegisterNameInField', action='store_true', help="Exclude register name from generated field names. Warning: This could cause naming conflicts.")
+    parser.add_argument('-abBaseAddressWidth', help="width of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='width', default=64, type=int)
+    parser.add_argument('-abBaseAddressFormat', help="format of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='format', default="hex")
+    parser.add_argument('-abHighAddressWidth', help="width of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='width', default=64, type=int)
+    parser.add_argument('-abHighAddressFormat', help="format of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='format', default="hex")
+    parser.add_argument('-regAddressOffsetWidth', help="width of std_logic_vector in generated register address offset output [default: %(default)s]", metavar='width', default=32, type=int)
+    parser.add_argument('-regAddressOffsetFormat', help="format of std_logic_vector in generated register address offset output [default: %(default)s]", metavar='format', default="hex")
+    parser.add_argument('-regResetMaskWidth', help="width of std_logic_vector in generated register reset mask output [default: %(default)s]", metavar='width', default=64, type=int)
+    parser.add_argument('-regResetMaskFormat', help="format of std_logic_vector in generated register reset mask output [default: %(default)s]", metavar='format', default="hex")
+    parser.add_argument('-regResetValueWidth', help="width of std_logic_vector in generated register reset value output [default: %(default)s]", metavar='width', default=32, type=int)
+    parser.add_argument('-regResetValueFormat', help="format of std_logic_vector in generated register reset value output [default: %(default)s]", metavar='format', default="hex")
+    parser.add_argument('-regBaseAddressOffsetWidth', help="width of std_logic_vector in generated register address offset output [default: %(default)s]", metavar='width', default=32, type=int)
+    parser.add_argument('-regBaseAddressOffsetFormat', help="format of std_logic_vector in generated register address offset mask output [default: %(default)s]", metavar='format', default="hex")
+    parser.add_argument('-memoryReport', '--memory-report', dest="memoryReport", action='store_true', help="report the RSS peaks of parsing, parameter resolution, output generation and the other phases on stderr, with python allocation peaks on Python 3. With -maxMemory, each output format is a phase")
+    parser.add_argument('-maxMemory', '--max-memory', dest="maxMemory", metavar='bytes', type=getScaledPositiveInteger, help="memory budget, i.e. 512M. Parses without whitespace and comments and generates one output format at a time, and fails with a message naming the phase when the budget is exceeded")
+    parser.add_argument('-serve', action='store_true', help="keep parsed components in memory and answer generate, query and validate requests on a unix socket, see ipxact_client.py")
+    parser.add_argument('-socket', metavar='path', default=SERVER_SOCKET_PATH, help="unix socket of -serve [default: %(default)s]")
+    parser.add_argument('-cacheSize', metavar='n', default=SERVER_CACHE_SIZE, type=int, help="number of components kept in memory by -serve [default: %(default)s]")
+    parser.add_argument('-V', '--version', action='version', version=versionMessage)
+    parser.add_argument('-cpath', dest="outc", help="Output path for c header file [default: %(default)s]",  default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "out/ipxact.h"))
+    parser.add_argument('-cmetapath', dest="outcmeta", help="Output path for c metadata file, see -cMeta [default: %(default)s]",  default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "out/ipxact_meta.c"))
+    parser.add_argument('-clookuppath', dest="outclookup", help="Output path for c name lookup file, see -cLookup [default: %(default)s]",  default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "out/ipxact_lookup.c"))
+    parser.add_argument('-vhdlpath', dest="outvhdl", help="Ouput path for vhdl package file [default: %(default)s]",  default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "out/ipxact.vhd"))
+    return parser
 
 def main(argv=None):  # IGNORE:C0111
     '''Command line options.'''
@@ -922,81 +3577,129 @@ USAGE
 
     try:
         # Setup argument parser
-        parser = ArgumentParser(description=program_license, formatter_class=RawDescriptionHelpFormatter)
-        parser.add_argument(dest="inpath", help="path to input IP-XACT source file")
-        parser.add_argument("-v", "--verbose", dest="verbose", action="count", help="set verbosity level [default: %(default)s]")
-        parser.add_argument('-c', action='store_true', help="enable c header output")
-        parser.add_argument('-vhdl', action='store_true', help="enable vhdl package output")
-        parser.add_argument('-shortPostfix', action='store_true', help="Abbreviate postfix, i.e _DESCRIPTION -> _DESC")
-        parser.add_argument('-noComponentNameInAb', action='store_true', help="Exclude component name from generated address block names. Warning: This could cause naming conflicts.")
-        parser.add_argument('-noComponentNameInReg', action='store_true', help="Exclude component name from generated register names. Warning: This could cause naming conflicts.")
-        parser.add_argument('-noAddressBlockNameInReg', action='store_true', help="Exclude address block name from generated register names. Warning: This could cause naming conflicts.")
-        parser.add_argument('-noComponentNameInField', action='store_true', help="Exclude component name from generated field names. Warning: This could cause naming conflicts.")
-        parser.add_argument('-noAddressBlockNameInField', action='store_true', help="Exclude address block name from generated field names. Warning: This could cause naming conflicts.")
-        parser.add_argument('-noRegisterNameInField', action='store_true', help="Exclude register name from generated field names. Warning: This could cause naming conflicts.")
-        parser.add_argument('-abBaseAddressWidth', help="width of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='width', default=64, type=int)
-        parser.add_argument('-abBaseAddressFormat', help="format of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='format', default="hex")
-        parser.add_argument('-abHighAddressWidth', help="width of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='width', default=64, type=int)
-        parser.add_argument('-abHighAddressFormat', help="format of std_logic_vector in generated addressblock address output [default: %(default)s]", metavar='format', default="hex")
-        parser.add_argument('-regAddressOffsetWidth', help="width of std_logic_vector in generated register address offset output [default: %(default)s]", metavar='width', default=32, type=int)
-        parser.add_argument('-regAddressOffsetFormat', help="format of std_logic_vector in generated register address offset output [default: %(default)s]", metavar='format', default="hex")
-        parser.add_argument('-regResetMaskWidth', help="width of std_logic_vector in generated register reset mask output [default: %(default)s]", metavar='width', default=64, type=int)
-        parser.add_argument('-regResetMaskFormat', help="format of std_logic_vector in generated register reset mask output [default: %(default)s]", metavar='format', default="hex")
-        parser.add_argument('-regResetValueWidth', help="width of std_logic_vector in generated register reset value output [default: %(default)s]", metavar='width', default=32, type=int)
-        parser.add_argument('-regResetValueFormat', help="format of std_logic_vector in generated register reset value output [default: %(default)s]", metavar='format', default="hex")
-        parser.add_argument('-regBaseAddressOffsetWidth', help="width of std_logic_vector in generated register address offset output [default: %(default)s]", metavar='width', default=32, type=int)
-        parser.add_argument('-regBaseAddressOffsetFormat', help="format of std_logic_vector in generated register address offset mask output [default: %(default)s]", metavar='format', default="hex")
-        parser.add_argument('-V', '--version', action='version', version=program_version_message)
-        parser.add_argument('-cpath', dest="outc", help="Output path for c header file [default: %(default)s]",  default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "out/ipxact.h"))
-        parser.add_argument('-vhdlpath', dest="outvhdl", help="Ouput path for vhdl package file [default: %(default)s]",  default=os.path.join(os.path.dirname(os.path.dirname(__file__)), "out/ipxact.vhd"))
+        parser = getArgumentParser(program_license, program_version_message)
         
         # Process arguments
         args = parser.parse_args()
   
         if args.verbose:
-            log.basicConfig(format="%(levelname)s: %(message)s", level=log.DEBUG, stream=sys.stdout)
+            log.basicConfig(format="%(levelname)s: %(message)s", level=log.DEBUG, stream=sys.stderr if writesToStdout(args) else sys.stdout)
         else:
             log.basicConfig(format="%(levelname)s: %(message)s")
                   
-        if args.inpath is not None:
-            inpath = os.path.normpath(args.inpath)
+        if args.serve:
+            sys.modules.setdefault('ipxact', sys.modules[__name__])
+            for plugin in (args.plugins or []):
+                loadEmitterPlugin(plugin)
+            serve(args.socket, args.cacheSize, getSchemaCacheDir(args))
+            return 0
+
+        if args.inpath is None:
+            parser.error("the input path is required")
+        inpath = os.path.normpath(args.inpath)
         
-        if args.outvhdl is not None:
-            args.outvhdl = os.path.abspath(os.path.normpath(args.outvhdl))
+        args.outvhdl = normOutputPath(args.outvhdl)
             
-        if args.outc is not None:
-            args.outc = os.path.abspath(os.path.normpath(args.outc))
+        args.outc = normOutputPath(args.outc)
+
+        args.outcmeta = normOutputPath(args.outcmeta)
+
+        args.outclookup = normOutputPath(args.outclookup)
     
         log.info("Input path: %s" % inpath)
             
         
         conf = Config(args)
+        monitor = None
             
         try:
-            root = openXMLFileReturnRoot(inpath)
+            # Plugins import ipxact to register their emitters, make sure they
+            # get this module also when it is run as a script.
+            sys.modules.setdefault('ipxact', sys.modules[__name__])
+            for plugin in (args.plugins or []):
+                loadEmitterPlugin(plugin)
+
+            lowMemory = args.maxMemory is not None
+            monitor = MemoryMonitor(args.memoryReport, args.maxMemory)
+
+            monitor.phase("parse")
+            root, digest = parseXMLFile(inpath, lowMemory)
+
+            monitor.phase("parameters")
+            resolveParameters(root, args.params)
+
+            if args.schemaValidate:
+                # Validates the resolved tree, which also depends on the overrides
+                monitor.phase("schema")
+                if args.params:
+                    digest = hashlib.sha256("\n".join([digest] + args.params)).hexdigest()
+                validateSchema(root, digest, args.schema, getSchemaCacheDir(args))
             
-            if args.vhdl:
-                log.info("Out directory (VHDL paclage): %s" % args.outvhdl)
-                printStr = vhdlFilePrint(root, conf)
-                if not os.path.exists(os.path.dirname(args.outvhdl)):
-                    os.makedirs(os.path.dirname(args.outvhdl))
-                with open(args.outvhdl, "w") as f:
-                    f.write(printStr)
-                    log.info("Wrote vhdl package to %s" % args.outvhdl)
-        
-         
-            if args.c:
-                log.info("Out directory (C header): %s" % args.outc)
-                printStr = cFilePrint(root, conf)
-                if not os.path.exists(os.path.dirname(args.outc)):
-                    os.makedirs(os.path.dirname(args.outc))
-                with open(args.outc, "w") as f:
-                    f.write(printStr)
-                    log.info("Wrote c header to %s" % args.outc)
-                
+            emitters = getEmitters(args, conf)
+
+            modelEmitter = None
+            if needsModel(args):
+                modelEmitter = ModelEmitter(conf)
+                emitters.append(modelEmitter)
+
+            if monitor.budget is None:
+                monitor.phase("emit")
+                walkComponent(root, emitters)
+
+                for emitter in emitters:
+                    for path, printStr in emitter.end():
+                        if writeOutputFile(path, printStr):
+                            log.info("Wrote %s output to %s" % (emitter.name, path))
+            else:
+                # One traversal per output format, so each phase only holds the
+                # strings of one format, which are released before the next.
+                while emitters:
+                    emitter = emitters.pop(0)
+                    monitor.phase("emit %s" % (emitter.name or "model"))
+                    walkComponent(root, [emitter])
+                    outputs = emitter.end()
+                    monitor.phase("write %s" % (emitter.name or "model"))
+                    for path, printStr in outputs:
+                        if writeOutputFile(path, printStr):
+                            log.info("Wrote %s output to %s" % (emitter.name, path))
+                    outputs = None
+
+            if args.validate:
+                monitor.phase("validate")
+                issues = validateModel(modelEmitter.model)
+                for name, issue in issues:
+                    log.error("%s: %s" % (name, issue))
+                log.info("Validation found %d issues" % len(issues))
+                if issues:
+                    return 1
+
+            if args.diff is not None:
+                monitor.phase("diff")
+                diffFile(modelEmitter.model, args)
+
+            if args.occupancy:
+                monitor.phase("occupancy")
+                occupancyFile(modelEmitter.model, args)
+
+            if args.decodeTrace is not None:
+                monitor.phase("trace")
+                decodeTraceFile(modelEmitter.model, args)
+
         except IOError as (errno, strerror):
             log.error("I/O error({0}): {1}".format(errno, strerror))
-             
+        except (MemoryError, etree.LxmlError) as e:
+            if monitor is None or not monitor.isOutOfMemory(e):
+                raise
+            raise monitor.outOfMemory()
+        finally:
+            # Not checking the budget here, so it neither masks an exception
+            # nor keeps the report from being written
+            if monitor is not None:
+                monitor.phase(check=False)
+                if monitor.report:
+                    sys.stderr.write(monitor.reportPrint())
+        if monitor is not None:
+            monitor.checkBudget()
         return 0
     except KeyboardInterrupt:
         ### handle keyboard interrupt ###
@@ -0,0 +1,103 @@
+#!/usr/local/bin/python2.7
+# encoding: utf-8
+'''
+ipxact_client -- Client of the ipxact generation server.
+
+Sends generate, query and validate requests to a server started with
+ipxact.py -serve, which keeps the parsed components in memory. Only uses
+the standard library, so it starts without loading lxml.
+
+@author:     Klaus Petersen
+
+@copyright:  2014 Klaus Petersen
+This work is free. You can redistribute it and/or modify it under the
+terms of the Do What The Fuck You Want To Public License, Version 2,
+as published by Sam Hocevar. See the COPYING file for more details.
+
+@license:    http://www.wtfpl.net/txt/copying/
+
+@contact:    klauspetersen@gmail.com
+'''
+
+import sys
+import os
+import json
+import socket
+import tempfile
+from collections import OrderedDict
+from argparse import ArgumentParser
+from argparse import REMAINDER
+
+SERVER_SOCKET_PATH = os.path.join(tempfile.gettempdir(), "ipxact-%d.sock" % os.getuid())
+
+def request(path, requestDict):
+    '''Send one request to the server on the unix socket path, returns the
+    response dict.'''
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+        client.sendall(json.dumps(requestDict) + "\n")
+        response = client.makefile("r").readline()
+    finally:
+        client.close()
+    if not response:
+        raise IOError("No response from server on %s" % path)
+    return json.loads(response, object_pairs_hook=OrderedDict)
+
+def main(argv=None):
+    '''Command line options.'''
+    parser = ArgumentParser(description="Client of the ipxact generation server, see ipxact.py -serve")
+    parser.add_argument('-socket', metavar='path', default=SERVER_SOCKET_PATH, help="unix socket of the server [default: %(default)s]")
+    subparsers = parser.add_subparsers(dest="op")
+    generate = subparsers.add_parser("generate", help="generate outputs, takes the arguments of ipxact.py")
+    generate.add_argument('argv', nargs=REMAINDER, help="ipxact.py arguments, i.e. -c -cpath out/regs.h component.xml")
+    query = subparsers.add_parser("query", help="address block and register at an address or of a name")
+    query.add_argument('path', help="path to input IP-XACT source file")
+    query.add_argument('key', help="address, or address block or register name, i.e. 0x80, SET or SET.COMMAND")
+    validate = subparsers.add_parser("validate", help="check reset values and field layout, see ipxact.py -validate")
+    validate.add_argument('path', help="path to input IP-XACT source file")
+    validate.add_argument('-schema', action='store_true', help="also validate against the IP-XACT schema")
+    subparsers.add_parser("stats", help="components in the server cache and cache hits")
+    # The ipxact.py arguments of generate are not known here
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.op != "generate":
+        parser.error("unrecognized arguments: %s" % " ".join(extra))
+
+    requestDict = dict(op=args.op)
+    if args.op == "generate":
+        requestDict.update(argv=extra + args.argv, cwd=os.getcwd())
+    elif args.op in ("query", "validate"):
+        requestDict['path'] = os.path.abspath(args.path)
+    if args.op == "query":
+        try:
+            requestDict['address'] = int(args.key, 0)
+        except ValueError:
+            requestDict['name'] = args.key
+    if args.op == "validate":
+        requestDict['schema'] = args.schema
+
+    try:
+        response = request(args.socket, requestDict)
+    except (IOError, socket.error), e:
+        sys.stderr.write("%s: %s\n" % (os.path.basename(sys.argv[0]), e))
+        return 2
+    if not response['ok']:
+        sys.stderr.write("%s\n" % response['error'])
+        return 2
+
+    if args.op == "generate":
+        for path in response['written']:
+            sys.stderr.write("Wrote %s\n" % path)
+        sys.stdout.write(response['stdout'])
+    elif args.op == "validate":
+        for name, issue in response['issues']:
+            sys.stdout.write("%s: %s\n" % (name, issue))
+        if response['issues']:
+            return 1
+    else:
+        del response['ok']
+        sys.stdout.write(json.dumps(response, indent=2, separators=(",", ": ")) + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+'''
+Helpers shared by the ipxact tests: paths of the example and test inputs,
+the ipxact module of src and running ipxact.py on the command line.
+'''
+
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(TEST_DIR), "src")
+DATA_DIR = os.path.join(TEST_DIR, "data")
+EXAMPLE_PATH = os.path.join(os.path.dirname(TEST_DIR), "example", "axi_motor_v2_00_a.xml")
+IPXACT_PATH = os.path.join(SRC_DIR, "ipxact.py")
+
+sys.path.insert(0, SRC_DIR)
+import ipxact
+
+
+def dataPath(name):
+    return os.path.join(DATA_DIR, name)
+
+
+class IpxactTestCase(unittest.TestCase):
+    '''Test case with a temporary directory for the outputs.'''
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="ipxact-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def tmpPath(self, name):
+        return os.path.join(self.tmp, name)
+
+    def read(self, path, mode="r"):
+        with open(path, mode) as f:
+            return f.read()
+
+    def runIpxact(self, *args, **kwargs):
+        '''Run ipxact.py with args, returns (returncode, stdout, stderr).'''
+        process = subprocess.Popen([sys.executable, IPXACT_PATH] + list(args), stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=kwargs.get('cwd', self.tmp))
+        stdout, stderr = process.communicate(kwargs.get('stdin'))
+        return process.returncode, stdout, stderr
+
+    def assertIpxact(self, *args, **kwargs):
+        '''Run ipxact.py with args, fail unless it succeeds, returns stdout.'''
+        returncode, stdout, stderr = self.runIpxact(*args, **kwargs)
+        self.assertEqual(returncode, 0, stderr)
+        return stdout
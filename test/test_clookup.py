@@ -0,0 +1,26 @@
+import distutils.spawn
+import subprocess
+import unittest
+
+from ipxacttest import IpxactTestCase, dataPath, ipxact
+
+
+class CLookupTest(IpxactTestCase):
+    def testHash(self):
+        # 32 bit FNV-1 test vectors
+        self.assertEqual(ipxact.cLookupHash(0, ""), 0x811C9DC5)
+        self.assertEqual(ipxact.cLookupHash(0, "a"), 0x050C5D7E)
+        self.assertEqual(ipxact.cLookupHash(0, "foobar"), 0x31F0B262)
+
+    @unittest.skipIf(distutils.spawn.find_executable("gcc") is None, "gcc not found")
+    def testSelftest(self):
+        # The self test looks up every name with the C hash, against tables built with the python one
+        self.assertIpxact("-c", "-cLookup", "-cpath", "regs.h", "-clookuppath", "lookup.c", dataPath("enums.xml"))
+        self.assertIn("INTR.DGIER.GIE.FAST", self.read(self.tmpPath("lookup.c")))
+        subprocess.check_call(["gcc", "-Wall", "-DIPXACT_LOOKUP_SELFTEST", "-o", "lookup", "lookup.c"], cwd=self.tmp)
+        output = subprocess.check_output([self.tmpPath("lookup")], cwd=self.tmp)
+        self.assertIn(" 0 failures", output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import distutils.spawn
+import re
+import subprocess
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+DESCRIPTION = u'Say "hi"\n\tthen C:\\ \x01 \xe9'
+
+
+class CMetaTest(IpxactTestCase):
+    def testStringLiteral(self):
+        self.assertEqual(ipxact.cMetaStringLiteral(DESCRIPTION), u'Say \\"hi\\"\\n\\tthen C:\\\\ \\001 \xe9')
+        self.assertEqual(ipxact.cMetaStringLiteral(b"\r\x7f1"), u"\\r\\1771")
+
+    def testPoolDeduplicates(self):
+        pool = ipxact.CStringPool()
+        self.assertEqual([pool.add(string) for string in (u"a", u"\xe9", u"a", u"b", u"\xe9")], [0, 2, 0, 5, 2])
+        self.assertEqual((pool.strings, pool.size), ([u"a", u"\xe9", u"b"], 7))
+        self.assertEqual(pool.add(None), ipxact.C_META_NONE)
+
+    def testHeaderWithoutStrings(self):
+        self.assertIpxact("-c", "-cMeta", "-cpath", "regs.h", "-cmetapath", "meta.c", EXAMPLE_PATH)
+        header = self.read(self.tmpPath("regs.h"))
+        self.assertIn("(ipxact_strtab + ", header)
+        self.assertEqual(re.findall(r'^#define .*".*$', header, re.M), [])
+        # The usage of all three address blocks is pooled once
+        usages = re.findall(r"^#define AXI_MOTOR_\w+_USAGE\s+(\(ipxact_strtab \+ \d+\))", header, re.M)
+        self.assertEqual(len(usages), 3)
+        self.assertEqual(len(set(usages)), 1)
+        pooled = re.findall(r'^    "(.*)\\0"\t/\* \d+ \*/$', self.read(self.tmpPath("meta.c")), re.M)
+        self.assertEqual(pooled.count("register"), 1)
+        self.assertEqual(len(pooled), len(set(pooled)))
+
+    def testCli(self):
+        root = ipxact.openXMLFileReturnRoot(EXAMPLE_PATH)
+        # XML has no control characters other than newline, tab and carriage return
+        description = DESCRIPTION.replace(u"\x01", u"\r").replace(u" \xe9", u"")
+        root.find(".//" + ipxact.IPXACT_NS + "register/" + ipxact.IPXACT_NS + "description").text = description
+        root.getroottree().write(self.tmpPath("component.xml"), encoding="utf-8")
+        self.assertIpxact("-c", "-cMeta", "-cpath", "regs.h", "-cmetapath", "meta.c", "component.xml")
+        meta = self.read(self.tmpPath("meta.c"))
+        self.assertIn('"Say \\"hi\\"\\n\\tthen C:\\\\ \\r\\0"', meta)
+        if distutils.spawn.find_executable("gcc") is not None:
+            subprocess.check_call(["gcc", "-Wall", "-Werror", "-c", "meta.c"], cwd=self.tmp)
+
+
+if __name__ == '__main__':
+    unittest.main()
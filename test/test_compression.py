@@ -0,0 +1,43 @@
+import gzip
+import shutil
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+
+class CompressionTest(IpxactTestCase):
+    def setUp(self):
+        IpxactTestCase.setUp(self)
+        self.assertIpxact("-c", "-cpath", "regs.h", EXAMPLE_PATH)
+        self.header = self.read(self.tmpPath("regs.h"))
+
+    def testGzip(self):
+        with open(EXAMPLE_PATH, "rb") as f, gzip.open(self.tmpPath("component.xml.gz"), "wb") as out:
+            shutil.copyfileobj(f, out)
+        self.assertIpxact("-c", "-cpath", "out.h.gz", "component.xml.gz")
+        with gzip.open(self.tmpPath("out.h.gz"), "rb") as f:
+            self.assertEqual(f.read(), self.header)
+
+    @unittest.skipIf(ipxact.lzma is None, "lzma not installed")
+    def testXz(self):
+        with open(EXAMPLE_PATH, "rb") as f:
+            with open(self.tmpPath("component.xml.xz"), "wb") as out:
+                out.write(ipxact.lzma.compress(f.read()))
+        self.assertIpxact("-c", "-cpath", "out.h.xz", "component.xml.xz")
+        with open(self.tmpPath("out.h.xz"), "rb") as f:
+            self.assertEqual(ipxact.lzma.decompress(f.read()), self.header)
+
+    def testStdio(self):
+        with open(EXAMPLE_PATH, "rb") as f:
+            stdout = self.assertIpxact("-c", "-cpath", "-", "-", stdin=f.read())
+        self.assertEqual(stdout, self.header)
+
+    def testUnchanged(self):
+        # Outputs with unchanged contents are not written again
+        returncode, stdout, stderr = self.runIpxact("-c", "-cpath", "regs.h", EXAMPLE_PATH)
+        self.assertEqual(returncode, 0)
+        self.assertIn("Unchanged", stdout + stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from ipxacttest import EXAMPLE_PATH, dataPath, ipxact
+
+np = ipxact.np
+
+
+def getRegister(path, name):
+    return ipxact.findModelRegister(ipxact.getComponentModel(ipxact.openXMLFileReturnRoot(path)), name)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class DecodeTest(unittest.TestCase):
+    def setUp(self):
+        self.register = getRegister(EXAMPLE_PATH, "SET.COMMAND")
+        self.values = np.array([0x21, 0x24, 0x0, 0x3F], dtype=np.uint32)
+
+    def testDecode(self):
+        columns = ipxact.decodeRegisterValues(self.register, self.values)
+        self.assertEqual(columns['RUN'].tolist(), [1, 0, 0, 1])
+        self.assertEqual(columns['STOP'].tolist(), [0, 1, 0, 1])
+        self.assertEqual(columns['JOG_DIRECTION'].tolist(), [1, 1, 0, 1])
+        decoded = ipxact.decodeRegisterValues(self.register, self.values, structured=True)
+        self.assertEqual(decoded['STOP'].tolist(), [0, 1, 0, 1])
+
+    def testRoundTrip(self):
+        for structured in (False, True):
+            fields = ipxact.decodeRegisterValues(self.register, self.values, structured)
+            self.assertEqual(ipxact.encodeRegisterValues(self.register, fields, np.uint32).tolist(), self.values.tolist())
+        self.assertEqual(ipxact.encodeRegisterValues(self.register, dict(RUN=1, STOP=[0, 1])).tolist(), [0x1, 0x5])
+
+    def testEnumeratedValues(self):
+        field = getRegister(dataPath("enums.xml"), "INTR.DGIER")['fields'][0]
+        names = ipxact.decodeEnumeratedValues(field, np.array([1, 0, 1]))
+        self.assertEqual(names.tolist(), ["FAST", "SLOW", "FAST"])
+        self.assertEqual(ipxact.encodeEnumeratedValues(field, names).tolist(), [1, 0, 1])
+        self.assertEqual(ipxact.decodeEnumeratedValues(field, np.array([1, 2]))[1], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+
+class DiffTest(IpxactTestCase):
+    def setUp(self):
+        IpxactTestCase.setUp(self)
+        root = ipxact.openXMLFileReturnRoot(EXAMPLE_PATH)
+        registers = root.findall(".//" + ipxact.IPXACT_NS + "register")
+        registers[0].find(ipxact.IPXACT_NS + "size").text = "16"
+        registers[1].getparent().remove(registers[1])
+        registers[2].find(ipxact.IPXACT_NS + "name").text = "RENAMED"
+        root.getroottree().write(self.tmpPath("new.xml"))
+
+    def testDiffModels(self):
+        oldModel = ipxact.getComponentModel(ipxact.openXMLFileReturnRoot(EXAMPLE_PATH))
+        self.assertEqual(ipxact.diffModels(oldModel, oldModel), [])
+        changes = ipxact.diffModels(oldModel, ipxact.getComponentModel(ipxact.openXMLFileReturnRoot(self.tmpPath("new.xml"))))
+        self.assertEqual([(change['change'], change['path']) for change in changes],
+                         [("removed", "INTR.IPISR"), ("changed", "INTR.DGIER"), ("renamed", "SET.RENAMED")])
+        self.assertEqual(changes[1]['attributes'], dict(size=[32, 16]))
+        self.assertEqual(changes[2]['oldName'], "DECELERATION")
+
+    def testCli(self):
+        stdout = self.assertIpxact("-diff", EXAMPLE_PATH, "new.xml")
+        self.assertIn("removed register INTR.IPISR", stdout)
+        self.assertIn("size: 32 -> 16", stdout)
+        self.assertIpxact("-diff", EXAMPLE_PATH, "-diffFormat", "json", "-diffOut", "diff.json", "new.xml")
+        self.assertEqual(len(json.loads(self.read(self.tmpPath("diff.json")))), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+PLUGIN = '''
+import ipxact
+
+class NamesEmitter(ipxact.Emitter):
+    extension = "txt"
+
+    def begin(self, root, compName):
+        ipxact.Emitter.begin(self, root, compName)
+        self.names = list()
+
+    def register(self, registerElement, number):
+        self.names.append(ipxact.ifNotNoneReturnText(registerElement.find(ipxact.IPXACT_NS + "name")))
+
+    def end(self):
+        return [(self.getOutputPath(), "\\n".join(self.names) + "\\n")]
+
+ipxact.registerEmitter("names", NamesEmitter)
+'''
+
+
+class EmitterTest(IpxactTestCase):
+    def testSinglePass(self):
+        self.assertIpxact("-c", "-vhdl", "-cpath", "regs.h", "-vhdlpath", "regs.vhd", EXAMPLE_PATH)
+        self.assertIpxact("-emit", "c,vhdl", "-emit", "json", "-emitpath", "c=fan.h", "-emitpath", "vhdl=fan.vhd", "-emitpath", "json=fan.json", EXAMPLE_PATH)
+        self.assertEqual(self.read(self.tmpPath("fan.h")), self.read(self.tmpPath("regs.h")))
+        self.assertEqual(self.read(self.tmpPath("fan.vhd")), self.read(self.tmpPath("regs.vhd")))
+        model = json.loads(self.read(self.tmpPath("fan.json")))
+        self.assertEqual(model['name'], "axi_motor")
+        self.assertEqual([addressBlock['name'] for addressBlock in model['addressBlocks']], ["INTR", "SET", "STS"])
+        command = [register for register in model['addressBlocks'][1]['registers'] if register['name'] == "COMMAND"][0]
+        self.assertEqual((command['address'], len(command['fields'])), (0x98, 6))
+
+    def testPlugin(self):
+        with open(self.tmpPath("names.py"), "w") as f:
+            f.write(PLUGIN)
+        self.assertIpxact("-plugin", "names.py", "-emit", "names", "-emitpath", "names=names.txt", EXAMPLE_PATH)
+        names = self.read(self.tmpPath("names.txt")).split()
+        self.assertIn("COMMAND", names)
+        model = ipxact.getComponentModel(ipxact.openXMLFileReturnRoot(EXAMPLE_PATH))
+        self.assertEqual(len(names), sum([len(addressBlock['registers']) for addressBlock in model['addressBlocks']]))
+
+    def testUnknown(self):
+        returncode, _, stderr = self.runIpxact("-emit", "nope", EXAMPLE_PATH)
+        self.assertNotEqual(returncode, 0)
+        self.assertIn("Unknown output format 'nope'", stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
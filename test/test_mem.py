@@ -0,0 +1,64 @@
+import binascii
+import unittest
+
+from ipxacttest import IpxactTestCase, dataPath, ipxact
+
+np = ipxact.np
+
+
+def getModel(path=dataPath("parameters.xml")):
+    root = ipxact.openXMLFileReturnRoot(path)
+    ipxact.resolveParameters(root)
+    return ipxact.getComponentModel(root)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class ResetImageTest(IpxactTestCase):
+    def testImage(self):
+        base, data, defined = ipxact.getResetImage(getModel())
+        self.assertEqual((base, len(data)), (0x1000, 0x1080))
+        self.assertEqual(data[0x3C:0x40].tolist(), [0xEF, 0xBE, 0xAD, 0xDE])
+        self.assertEqual(np.flatnonzero(defined).tolist(), [0x3C, 0x3D, 0x3E, 0x3F, 0x1004, 0x1005])
+        base, data, defined = ipxact.getResetImage(getModel(), bigEndian=True, base=0x1030)
+        self.assertEqual((base, data[0xC:0x10].tolist()), (0x1030, [0xDE, 0xAD, 0xBE, 0xEF]))
+
+    def testReadmemh(self):
+        self.assertIpxact("-emit", "mem", "-emitpath", "mem=regs.mem", "-memSparse", dataPath("parameters.xml"))
+        lines = [line for line in self.read(self.tmpPath("regs.mem")).splitlines() if not line.startswith("//")]
+        self.assertEqual(lines, ["@F", "DEADBEEF", "@401", "0000001F"])
+
+    def testIhex(self):
+        self.assertIpxact("-emit", "mem", "-emitpath", "mem=regs.hex", "-memSparse", dataPath("parameters.xml"))
+        records = self.read(self.tmpPath("regs.hex")).split()
+        self.assertEqual(records[-1], ":00000001FF")
+        for record in records:
+            self.assertEqual(sum(bytearray(binascii.unhexlify(record[1:]))) & 0xFF, 0, record)
+        self.assertIn("EFBEADDE", records[0])
+
+    def testSparseFarApart(self):
+        with open(dataPath("parameters.xml")) as source:
+            text = source.read().replace("<spirit:baseAddress>0x2000<", "<spirit:baseAddress>0xC0000000<")
+        with open(self.tmpPath("far.xml"), "w") as target:
+            target.write(text)
+        base, segments = ipxact.getSparseResetImage(getModel(self.tmpPath("far.xml")), alignment=4)
+        self.assertEqual([(start, len(data)) for start, data, _ in segments], [(0x103C, 4), (0xC0000004, 4)])
+        self.assertIpxact("-emit", "mem", "-emitpath", "mem=regs.mem", "-memSparse", self.tmpPath("far.xml"))
+        lines = [line for line in self.read(self.tmpPath("regs.mem")).splitlines() if not line.startswith("//")]
+        self.assertEqual(lines, ["@F", "DEADBEEF", "@2FFFFC01", "0000001F"])
+        self.assertIpxact("-emit", "mem", "-emitpath", "mem=regs.hex", "-memSparse", self.tmpPath("far.xml"))
+        records = self.read(self.tmpPath("regs.hex")).split()
+        self.assertEqual(records[-3:], [":02000004C0003A", ":040004001F000000D9", ":00000001FF"])
+
+    def testWidth(self):
+        rc, _, stderr = self.runIpxact("-emit", "mem", "-emitpath", "mem=regs.mem", "-memWidth", "12", dataPath("parameters.xml"))
+        self.assertEqual(rc, 1)
+        self.assertIn("-memWidth must be a positive multiple of 8", stderr)
+
+    def testBin(self):
+        self.assertIpxact("-emit", "mem", "-emitpath", "mem=regs.bin", "-memEndian", "big", dataPath("parameters.xml"))
+        data = self.read(self.tmpPath("regs.bin"), "rb")
+        self.assertEqual((len(data), data[0x3C:0x40]), (0x1080, b"\xDE\xAD\xBE\xEF"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+
+class MemoryMonitorTest(IpxactTestCase):
+    def getMonitor(self):
+        # A budget given to the constructor would limit the address space of the tests
+        monitor = ipxact.MemoryMonitor(report=True)
+        monitor.budget = 1
+        return monitor
+
+    def testBudget(self):
+        monitor = self.getMonitor()
+        monitor.phase("parse")
+        self.assertRaises(ipxact.CLIError, monitor.phase, "c")
+        self.assertEqual([phase[0] for phase in monitor.phases], ["parse"])
+
+    def testUnchecked(self):
+        monitor = self.getMonitor()
+        monitor.phase("parse")
+        monitor.phase(check=False)
+        self.assertIn("parse", monitor.reportPrint())
+        self.assertRaises(ipxact.CLIError, monitor.checkBudget)
+
+    def testReportOnError(self):
+        returncode, _, stderr = self.runIpxact("-memoryReport", "-param", "NOPE=1", "-c", "-cpath", self.tmpPath("regs.h"), EXAMPLE_PATH)
+        self.assertNotEqual(returncode, 0)
+        self.assertIn("Unknown parameter 'NOPE'", stderr)
+        self.assertIn("parameters", stderr)
+
+    def testReport(self):
+        # Reporting alone keeps the single traversal of all output formats
+        returncode, _, stderr = self.runIpxact("-memoryReport", "-c", "-cpath", self.tmpPath("regs.h"), EXAMPLE_PATH)
+        self.assertEqual(returncode, 0)
+        for phase in ("parse", "parameters", "emit"):
+            self.assertIn(phase, stderr)
+        self.assertNotIn("write", stderr)
+
+    def testBudgetPerFormat(self):
+        returncode, _, stderr = self.runIpxact("-memoryReport", "-maxMemory", "1G", "-c", "-cpath", self.tmpPath("regs.h"), EXAMPLE_PATH)
+        self.assertEqual(returncode, 0)
+        self.assertIn("write c", stderr)
+
+    def testBudgetBelowRss(self):
+        returncode, _, stderr = self.runIpxact("-maxMemory", "1M", "-c", "-cpath", self.tmpPath("regs.h"), EXAMPLE_PATH)
+        self.assertNotEqual(returncode, 0)
+        self.assertIn("Memory budget of 1.0 MiB is below", stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+np = ipxact.np
+
+
+def getModel(registers, baseAddress=0x1000, range_=0x100):
+    addressBlock = dict(name="A", baseAddress=baseAddress, range=range_, width=32, registers=registers)
+    return dict(name="comp", addressBlocks=[addressBlock])
+
+
+def getRegister(address, size=32, dim=None):
+    return dict(address=address, size=size, dim=dim)
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class OccupancyTest(IpxactTestCase):
+    def testMergeIntervals(self):
+        starts, lasts = ipxact.mergeIntervals(np.array([20, 0, 4, 10, 30], dtype=np.uint64), np.array([29, 3, 7, 12, 40], dtype=np.uint64))
+        self.assertEqual((starts.tolist(), lasts.tolist()), ([0, 10, 20], [7, 12, 40]))
+        starts, lasts = ipxact.mergeIntervals(np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64))
+        self.assertEqual((len(starts), len(lasts)), (0, 0))
+
+    def testFreeWindows(self):
+        top = ipxact.ADDRESS_SPACE_SIZE - 1
+        starts, lasts = ipxact.getFreeWindows(np.array([0, 10, top - 3], dtype=np.uint64), np.array([3, 12, top], dtype=np.uint64), 0, top)
+        self.assertEqual((starts.tolist(), lasts.tolist()), ([4, 13], [9, top - 4]))
+        starts, lasts = ipxact.getFreeWindows(np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.uint64), 0, top)
+        self.assertEqual((starts.tolist(), lasts.tolist()), ([0], [top]))
+
+    def testReport(self):
+        report = ipxact.getOccupancyReport(getModel([getRegister(0x1000), getRegister(0x1010, dim=4), getRegister(0x1014)]), top=2)
+        block = report['addressBlocks'][0]
+        self.assertEqual((block['used'], block['freeWindows'], block['alignedSlots']), (0x14, 2, 59))
+        self.assertEqual([(window['start'], window['size']) for window in block['largestFreeWindows']], [(0x1020, 0xE0), (0x1004, 0xC)])
+        self.assertEqual((report['used'], report['freeWindows']), (0x100, 2))
+
+    def testCli(self):
+        report = json.loads(self.assertIpxact("-occupancy", "-occupancyFormat", "json", EXAMPLE_PATH))
+        self.assertEqual([block['name'] for block in report['addressBlocks']], ["INTR", "SET", "STS"])
+        self.assertIn("Address block SET", self.assertIpxact("-occupancy", EXAMPLE_PATH))
+
+
+if __name__ == '__main__':
+    unittest.main()
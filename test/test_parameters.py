@@ -0,0 +1,85 @@
+import unittest
+
+from ipxacttest import IpxactTestCase, dataPath, ipxact
+
+
+def getModel(path, params=None):
+    root = ipxact.openXMLFileReturnRoot(path)
+    ipxact.resolveParameters(root, params)
+    return ipxact.getComponentModel(root)
+
+
+class ParameterResolverTest(IpxactTestCase):
+    def testDefaults(self):
+        addressBlock = getModel(dataPath("parameters.xml"))['addressBlocks'][0]
+        register = addressBlock['registers'][0]
+        self.assertEqual((addressBlock['baseAddress'], addressBlock['range'], addressBlock['width']), (0x1000, 64, 32))
+        self.assertEqual((register['addressOffset'], register['size'], register['resetValue']), (60, 32, 0xDEADBEEF))
+        self.assertEqual((register['fields'][0]['bitOffset'], register['fields'][0]['bitWidth']), (4, 8))
+
+    def testOverrideById(self):
+        addressBlock = getModel(dataPath("parameters.xml"), ["dw=16", "BASE=0x2000 + 0x10"])['addressBlocks'][0]
+        register = addressBlock['registers'][0]
+        self.assertEqual((addressBlock['baseAddress'], addressBlock['range'], addressBlock['width']), (0x2010, 32, 16))
+        self.assertEqual((register['addressOffset'], register['resetValue'], register['fields'][0]['bitWidth']), (28, 0xBEEF, 4))
+
+    def testConstantExpressions(self):
+        # Constant expressions are written back, plain literals with an id keep their text
+        root = ipxact.openXMLFileReturnRoot(dataPath("parameters.xml"))
+        ipxact.resolveParameters(root)
+        addressBlock = root.findall(".//" + ipxact.IPXACT_NS + "addressBlock")[1]
+        self.assertEqual(addressBlock.find(ipxact.IPXACT_NS + "range").text, "128")
+        self.assertEqual(addressBlock.find(".//" + ipxact.IPXACT_NS + "addressOffset").text, "0x04")
+        self.assertEqual(addressBlock.find(".//" + ipxact.IPXACT_NS + "mask").text, "0xFFFF")
+
+    def testConstantExpressionsCli(self):
+        self.assertIpxact("-c", "-cpath", self.tmpPath("regs.h"), dataPath("parameters.xml"))
+        header = self.read(self.tmpPath("regs.h"))
+        self.assertRegexpMatches(header, r"PARAM_COMP_B_S_RESETMASK\s+0xFFFF\s")
+        self.assertNotIn("32'h", header)
+
+    def testIdCall(self):
+        # id('...') arguments are strings, not based literals like 'd10
+        self.assertEqual(ipxact.parseExpression("id('data_width') * 2"), ('binary', '*', ('ref', 'data_width'), ('num', 2)))
+        self.assertEqual(ipxact.parseExpression("8'hFF + 'd1"), ('binary', '+', ('num', 255), ('num', 1)))
+        addressBlock = getModel(dataPath("parameters.xml"), ["BASE=id('dw') * 0x100"])['addressBlocks'][0]
+        self.assertEqual(addressBlock['baseAddress'], 0x2000)
+
+    def testCycle(self):
+        with self.assertRaises(ipxact.CLIError) as context:
+            getModel(dataPath("parameters.xml"), ["dw=NREGS * 2"])
+        self.assertIn("Parameter dependency cycle", str(context.exception))
+
+    def testDivisionByZero(self):
+        with self.assertRaises(ipxact.CLIError) as context:
+            getModel(dataPath("parameters.xml"), ["BASE=0x1000 / (dw - 32)"])
+        self.assertIn("Division by zero in parameter 'BASE'", str(context.exception))
+        rc, _, stderr = self.runIpxact("-param", "BASE=1 % (dw - 32)", "-c", "-cpath", self.tmpPath("regs.h"), dataPath("parameters.xml"))
+        self.assertEqual(rc, 1)
+        self.assertIn("Division by zero in parameter 'BASE'", stderr)
+
+    def testUnknownParameter(self):
+        self.assertRaises(ipxact.CLIError, getModel, dataPath("parameters.xml"), ["NOPE=1"])
+
+    def testNotStrict(self):
+        root = ipxact.openXMLFileReturnRoot(dataPath("parameters.xml"))
+        self.assertEqual(ipxact.resolveParameters(root, ["NOPE=1"], strict=False).value('DATA_W'), 32)
+
+    def testDiffResolvesOldVersion(self):
+        stdout = self.assertIpxact("-param", "dw=16", "-diff", dataPath("parameters.xml"), dataPath("parameters.xml"))
+        self.assertEqual(stdout.strip(), "")
+
+    def testStringParameters(self):
+        # String model parameters and parameters are left alone
+        root = ipxact.openXMLFileReturnRoot(dataPath("parameters.xml"))
+        resolver = ipxact.resolveParameters(root)
+        self.assertEqual(resolver.expressions['PART'][0], 'str')
+        self.assertEqual(root.find(".//" + ipxact.IPXACT_NS + "modelParameter/" + ipxact.IPXACT_NS + "value").text, "zynq")
+
+    def testStringModelParameterCli(self):
+        self.assertIpxact("-c", "-cpath", self.tmpPath("regs.h"), dataPath("parameters.xml"))
+        self.assertIn("PARAM_COMP_A_R_RESETVALUE", self.read(self.tmpPath("regs.h")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import imp
+import os
+import struct
+import subprocess
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, dataPath
+
+REGS_TEST = '''
+import sys
+sys.path.insert(0, sys.argv[1])
+import regs
+with open(sys.argv[2], "wb") as f:
+    f.write(b"\\0" * (0x10 + regs.SPAN))
+registers = regs.Registers(sys.argv[2], base=0x10)
+registers.write("SET.COMMAND", 0x21)
+assert registers.readField("SET.COMMAND", "JOG_DIRECTION") == 1
+registers.update("SET.COMMAND", RUN=0, STOP=1)
+assert registers.read("SET.COMMAND") == 0x24
+view = registers.view("SET")
+assert len(view) == 0x80 and view[0x18:0x19] == b"\\x24"
+assert registers.snapshotRegisters(registers.snapshot("SET"), "SET")["SET.COMMAND"] == 0x24
+registers.close()
+del view
+'''
+
+
+class PythonEmitterTest(IpxactTestCase):
+    def setUp(self):
+        IpxactTestCase.setUp(self)
+        self.assertIpxact("-emit", "python", "-emitpath", "python=%s" % self.tmpPath("regs.py"), EXAMPLE_PATH)
+        self.data = self.tmpPath("mem.bin")
+
+    def testRegisters(self):
+        regs = imp.load_source("regs", self.tmpPath("regs.py"))
+        with open(self.data, "wb") as f:
+            f.write(b"\0" * (0x10 + regs.SPAN))
+        with regs.Registers(self.data, base=0x10) as registers:
+            registers.write("SET.COMMAND", 0x21)
+            self.assertEqual(registers.read("SET.COMMAND"), 0x21)
+            self.assertEqual(registers.readFields("SET.COMMAND")['JOG_DIRECTION'], 1)
+            registers.update("SET.COMMAND", RUN=0, STOP=1)
+            self.assertEqual(registers.read("SET.COMMAND"), 0x24)
+            view = registers.view("SET")
+            self.assertEqual(len(view), 0x80)
+            self.assertEqual(view[0x18:0x1C], struct.pack("<I", 0x24))
+            self.assertEqual(registers.snapshotRegisters(registers.snapshot())["SET.COMMAND"], 0x24)
+        # The mapping is written through to the file
+        with open(self.data, "rb") as f:
+            self.assertEqual(struct.unpack_from("<I", f.read(), 0x10 + 0x98)[0], 0x24)
+
+    def testRegistersPython3(self):
+        # close() with a view alive raises BufferError on Python 3 unless handled
+        try:
+            process = subprocess.Popen(["python3", "-c", REGS_TEST, self.tmp, self.data], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        except OSError:
+            self.skipTest("python3 not found")
+        output = process.communicate()[0]
+        self.assertEqual(process.returncode, 0, output)
+
+
+    def testArrays(self):
+        # Register arrays get an entry per element, registers over 64 bits are skipped
+        self.assertIpxact("-emit", "python", "-emitpath", "python=%s" % self.tmpPath("arrays.py"), dataPath("arrays.xml"))
+        regs = imp.load_source("arrays", self.tmpPath("arrays.py"))
+        self.assertEqual(sorted(regs.REGISTERS), ["A.CTRL", "A.LUT[0]", "A.LUT[1]", "A.LUT[2]", "A.LUT[3]"])
+        self.assertEqual(regs.REGISTERS["A.LUT[3]"][0], 0x36)
+        with open(self.data, "wb") as f:
+            f.write(b"\0" * regs.SPAN)
+        with regs.Registers(self.data) as registers:
+            registers.update("A.LUT[3]", V=0xAB)
+            self.assertEqual(registers.read("A.LUT[3]"), 0xAB0)
+            self.assertEqual(registers.read("A.LUT[2]"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
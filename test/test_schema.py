@@ -0,0 +1,33 @@
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, dataPath, ipxact
+
+
+class SchemaTest(IpxactTestCase):
+    def testCachedValidation(self):
+        root, digest = ipxact.parseXMLFile(EXAMPLE_PATH)
+        ipxact.schemas.clear()
+        ipxact.validateSchema(root, digest, cacheDir=self.tmp)
+        self.assertEqual(len(ipxact.schemas), 1)
+        # A cached result does not need the compiled schema
+        ipxact.schemas.clear()
+        ipxact.validateSchema(root, digest, cacheDir=self.tmp)
+        self.assertEqual(len(ipxact.schemas), 0)
+
+    def testViolation(self):
+        root, digest = ipxact.parseXMLFile(EXAMPLE_PATH)
+        root.find(".//" + ipxact.IPXACT_NS + "addressBlock").append(root.makeelement(ipxact.IPXACT_NS + "bogus"))
+        self.assertRaises(ipxact.CLIError, ipxact.validateSchema, root, digest + "-modified", cacheDir=self.tmp)
+
+    def testCli(self):
+        self.assertIpxact("-schemaValidate", "-schemaCache", self.tmp, "-c", "-cpath", self.tmpPath("regs.h"), EXAMPLE_PATH)
+
+
+    def testParameterizedCli(self):
+        # Expressions are resolved before the validation
+        for params in ([], ["-param", "dw=16"]):
+            self.assertIpxact(*["-schemaValidate", "-schemaCache", self.tmp, "-c", "-cpath", self.tmpPath("regs.h")] + params + [dataPath("parameters.xml")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, SRC_DIR, dataPath, ipxact
+import ipxact_client
+
+
+class ComponentCacheTest(IpxactTestCase):
+    def getExpectedModel(self, params):
+        root = ipxact.openXMLFileReturnRoot(dataPath("parameters.xml"))
+        ipxact.resolveParameters(root, params)
+        return ipxact.getComponentModel(root)
+
+    def testParameterRoot(self):
+        cache = ipxact.ComponentCache()
+        entry = cache.get(dataPath("parameters.xml"))
+        for params in (["dw=16"], ["dw=16", "BASE=0x3000"], ["BASE=0x3000"], ["DATA_W=8"], []):
+            with entry['lock']:
+                model = ipxact.getComponentModel(cache.getParameterRoot(entry, params))
+            self.assertEqual(model, self.getExpectedModel(params), params)
+        # The tree without overrides is left alone
+        self.assertEqual(ipxact.getComponentModel(entry['root']), entry['model'])
+
+    def testParameterRootFailure(self):
+        cache = ipxact.ComponentCache()
+        entry = cache.get(dataPath("parameters.xml"))
+        cache.getParameterRoot(entry, ["dw=16"])
+        self.assertRaises(ipxact.CLIError, cache.getParameterRoot, entry, ["NOPE=1"])
+        model = ipxact.getComponentModel(cache.getParameterRoot(entry, ["BASE=0x3000"]))
+        self.assertEqual(model, self.getExpectedModel(["BASE=0x3000"]))
+
+
+class ComponentServerTest(IpxactTestCase):
+    def setUp(self):
+        IpxactTestCase.setUp(self)
+        self.socketPath = self.tmpPath("ipxact.sock")
+        self.server = ipxact.ComponentServer(self.socketPath, schemaCache=self.tmp)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        IpxactTestCase.tearDown(self)
+
+    def request(self, **request):
+        response = ipxact_client.request(self.socketPath, request)
+        self.assertTrue(response['ok'], response.get('error'))
+        return response
+
+    def testGenerate(self):
+        self.assertIpxact("-c", "-cpath", "direct.h", EXAMPLE_PATH)
+        for _ in range(2):
+            self.request(op="generate", argv=["-c", "-cpath", "served.h", EXAMPLE_PATH], cwd=self.tmp)
+        self.assertEqual(self.read(self.tmpPath("served.h")), self.read(self.tmpPath("direct.h")))
+        stdout = self.request(op="generate", argv=["-c", "-cpath", "-", "-param", "dw=16", dataPath("parameters.xml")])['stdout']
+        self.assertRegexpMatches(stdout, r"PARAM_COMP_A_WIDTH\s+16\s")
+        stats = self.request(op="stats")
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def testQuery(self):
+        response = self.request(op="query", path=EXAMPLE_PATH, address=0x98)
+        self.assertEqual((response['addressBlock'], response['register']['name']), ("SET", "COMMAND"))
+        response = self.request(op="query", path=EXAMPLE_PATH, name="STS")
+        self.assertEqual(response['addressBlock']['baseAddress'], 0x100)
+
+    def testValidate(self):
+        # The schema checks the tree with resolved parameters
+        issues = self.request(op="validate", path=dataPath("parameters.xml"), schema=True)['issues']
+        self.assertEqual([name for name, _ in issues], ["A.R"])
+        self.assertEqual(self.request(op="validate", path=EXAMPLE_PATH, schema=True)['issues'], [])
+        # Passed inputs are remembered in the -schemaCache directory
+        self.assertEqual(len([name for name in os.listdir(self.tmp) if name != "ipxact.sock"]), 2)
+
+    def testErrors(self):
+        response = ipxact_client.request(self.socketPath, dict(op="nope"))
+        self.assertFalse(response['ok'])
+        response = ipxact_client.request(self.socketPath, dict(op="generate", argv=["-validate", EXAMPLE_PATH]))
+        self.assertIn("not served", response['error'])
+
+    def testClient(self):
+        process = subprocess.Popen([sys.executable, os.path.join(SRC_DIR, "ipxact_client.py"), "-socket", self.socketPath, "query", EXAMPLE_PATH, "SET.COMMAND"],
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr)
+        self.assertEqual(json.loads(stdout)['register']['address'], 0x98)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import distutils.spawn
+import os
+import re
+import subprocess
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+BLOCKS = ("INTR", "SET", "STS")
+
+
+class SplitBlocksTest(IpxactTestCase):
+    def getDefines(self, text):
+        return sorted(re.findall(r"^#define .*$", text, re.M))
+
+    def testC(self):
+        self.assertIpxact("-c", "-cpath", "whole.h", EXAMPLE_PATH)
+        self.assertIpxact("-c", "-splitBlocks", "-cpath", "regs.h", EXAMPLE_PATH)
+        umbrella = self.read(self.tmpPath("regs.h"))
+        self.assertIn('#include "regs_types.h"', umbrella)
+        defines = self.getDefines(self.read(self.tmpPath("regs_types.h")))
+        for block in BLOCKS:
+            self.assertIn('#include "regs_%s.h"' % block, umbrella)
+            defines += self.getDefines(self.read(self.tmpPath("regs_%s.h" % block)))
+        # The split headers hold the same constants as the single header
+        self.assertEqual(sorted(defines), self.getDefines(self.read(self.tmpPath("whole.h"))))
+        if distutils.spawn.find_executable("gcc") is not None:
+            with open(self.tmpPath("main.c"), "w") as f:
+                f.write('#include "regs.h"\nint main(void) { return AXI_MOTOR_SET_COMMAND_ADDRESSBLOCKOFFSET == 0x18 ? 0 : 1; }\n')
+            subprocess.check_call(["gcc", "-Wall", "-o", "main", "main.c"], cwd=self.tmp)
+            subprocess.check_call([self.tmpPath("main")])
+
+    def testCMeta(self):
+        # Each block pools its own strings, editing one block leaves the other headers alone
+        root = ipxact.openXMLFileReturnRoot(EXAMPLE_PATH)
+        root.find(".//" + ipxact.IPXACT_NS + "addressBlock/" + ipxact.IPXACT_NS + "description").text = "Edited description of INTR"
+        root.getroottree().write(self.tmpPath("edited.xml"))
+        for name, path in (("a", EXAMPLE_PATH), ("b", "edited.xml")):
+            os.mkdir(self.tmpPath(name))
+            self.assertIpxact("-c", "-cMeta", "-splitBlocks", "-cpath", name + "/regs.h", "-cmetapath", name + "/meta.c", path)
+        self.assertNotEqual(self.read(self.tmpPath("a/regs_INTR.h")), self.read(self.tmpPath("b/regs_INTR.h")))
+        for block in ("types", "SET", "STS"):
+            self.assertEqual(self.read(self.tmpPath("a/regs_%s.h" % block)), self.read(self.tmpPath("b/regs_%s.h" % block)), block)
+        self.assertIn("(ipxact_strtab_set + ", self.read(self.tmpPath("a/regs_SET.h")))
+        if distutils.spawn.find_executable("gcc") is not None:
+            with open(self.tmpPath("main.c"), "w") as f:
+                f.write('#include <string.h>\n#include "b/regs.h"\nint main(void) { return strcmp(AXI_MOTOR_SET_COMMAND_NAME, "COMMAND")'
+                        ' || strcmp(ipxact_strtab_intr + ipxact_ab_meta_intr[AXI_MOTOR_INTR_METAINDEX].description, "Edited description of INTR"); }\n')
+            subprocess.check_call(["gcc", "-Wall", "-I", "b", "-o", "main", "main.c", "b/meta.c"], cwd=self.tmp)
+            subprocess.check_call([self.tmpPath("main")])
+
+    def testVhdl(self):
+        self.assertIpxact("-vhdl", "-splitBlocks", "-vhdlpath", "regs.vhd", EXAMPLE_PATH)
+        for block in BLOCKS:
+            self.assertIn("package regs_%s is" % block.lower(), self.read(self.tmpPath("regs_%s.vhd" % block)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import gzip
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+TRACE = "0x98 0x21 W\n# comment\n0x20 0x1 R\n0x400 0x0 R\n"
+
+
+class AddressIndexTest(unittest.TestCase):
+    def testDim(self):
+        registers = [dict(name="R", address=0x1000, size=32, dim=None), dict(name="ARRAY", address=0x1010, size=16, dim=4)]
+        addressBlock = dict(name="A", baseAddress=0x1000, range=0x100, width=32, registers=registers)
+        index = ipxact.AddressIndex(dict(name="comp", addressBlocks=[addressBlock]))
+        self.assertEqual(index.lookup(0x1003)[1]['name'], "R")
+        self.assertEqual(index.lookup(0x1004), (addressBlock, None))
+        for address in (0x1010, 0x1016, 0x1017):
+            self.assertEqual(index.lookup(address)[1]['name'], "ARRAY")
+        self.assertEqual(index.lookup(0x1018), (addressBlock, None))
+        self.assertEqual(index.lookup(0x1100), (None, None))
+
+
+class DecodeTraceTest(IpxactTestCase):
+    def testText(self):
+        with open(self.tmpPath("trace.txt"), "w") as f:
+            f.write(TRACE)
+        lines = self.assertIpxact("-decodeTrace", self.tmpPath("trace.txt"), EXAMPLE_PATH).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("SET.COMMAND", lines[0])
+        self.assertIn("RUN=0x1", lines[0])
+        self.assertIn("<unmapped>", lines[2])
+
+    def testBinaryHistogram(self):
+        with open(self.tmpPath("trace.bin"), "wb") as f:
+            f.write(ipxact.TRACE_BIN_RECORD.pack(0x98, 0x21, 1) + ipxact.TRACE_BIN_RECORD.pack(0x98, 0x0, 0))
+        stdout = self.assertIpxact("-decodeTrace", self.tmpPath("trace.bin"), "-traceHistogram", EXAMPLE_PATH)
+        self.assertRegexpMatches(stdout, r"SET.COMMAND\s+1\s+1")
+
+    def testCompressedBinary(self):
+        # The format comes from the extension before the compression suffix
+        traceFile = gzip.open(self.tmpPath("trace.bin.gz"), "wb")
+        traceFile.write(ipxact.TRACE_BIN_RECORD.pack(0x98, 0x21, 1))
+        traceFile.close()
+        stdout = self.assertIpxact("-decodeTrace", self.tmpPath("trace.bin.gz"), EXAMPLE_PATH)
+        self.assertIn("SET.COMMAND", stdout)
+        self.assertIn("RUN=0x1", stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from ipxacttest import IpxactTestCase, EXAMPLE_PATH, ipxact
+
+
+def getField(name, bitOffset, bitWidth, access=None):
+    return dict(name=name, bitOffset=bitOffset, bitWidth=bitWidth, access=access)
+
+
+class ValidateTest(IpxactTestCase):
+    def getIssues(self, fields, resetValue=None, resetMask=None, size=8):
+        register = dict(name="R", size=size, access="read-write", resetValue=resetValue, resetMask=resetMask, fields=fields)
+        return ipxact.validateRegister(dict(name="A", width=32), register)
+
+    def testValid(self):
+        self.assertEqual(self.getIssues([getField("A", 0, 4), getField("B", 4, 4)], 0x5A), [])
+        self.assertEqual(ipxact.validateModel(ipxact.getComponentModel(ipxact.openXMLFileReturnRoot(EXAMPLE_PATH))), [])
+
+    def testIssues(self):
+        self.assertEqual(self.getIssues([getField("A", 0, 4)], 0x100), ["reset value 0x100 does not fit in 8 bits"])
+        self.assertEqual(self.getIssues([getField("A", 0, 4), getField("B", 2, 4)]), ["field B bits 5..2 overlap A"])
+        self.assertEqual(self.getIssues([getField("A", 6, 4)]), ["field A bits 9..6 exceed register size 8"])
+        self.assertEqual(self.getIssues([getField("A", 0, 4)], 0x30), ["reset value 0x30 sets bits 0x30 outside of all fields"])
+        self.assertEqual(self.getIssues([getField("A", 0, 4)], 0x30, 0x0F), [])
+        self.assertEqual(self.getIssues([getField("A", 0, 4, "write-only")], 0x1), ["reset value 0x1 sets bits 0x1 of write-only fields"])
+
+    def testCli(self):
+        self.assertIpxact("-validate", EXAMPLE_PATH)
+        root = ipxact.openXMLFileReturnRoot(EXAMPLE_PATH)
+        root.findall(".//" + ipxact.IPXACT_NS + "reset/" + ipxact.IPXACT_NS + "value")[1].text = "0x100"
+        root.getroottree().write(self.tmpPath("component.xml"))
+        returncode, stdout, stderr = self.runIpxact("-validate", "component.xml")
+        self.assertEqual(returncode, 1)
+        self.assertIn("INTR.IPISR: reset value 0x100 sets bits 0x100 outside of all fields", stdout + stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()